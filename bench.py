@@ -0,0 +1,512 @@
+"""
+오프라인 벤치마크: 로컬 가짜 Notion / Google Calendar / Discord 서버로 script.py 측정
+
+    python bench.py                                  # 기본: pages 1k,10k / events 10,100
+    python bench.py --pages 1000 10000 100000 --events 10 100 500
+    python bench.py --json > bench_output.txt
+
+- 가짜 서버는 별도 프로세스(메모리/GIL 분리)에서 돌고 엔드포인트별 호출 수 / 바이트를 셈
+- 레이트리밋은 끄고 측정하고, 실제 API 한도(RATE_LIMITS)에서의 최소 소요 시간을 따로 계산
+- 측정 대상: sync_gcal_to_notion / fetch_notion_data_for_window / create_discord_payload
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+import multiprocessing
+from datetime import datetime, date, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+KST = timezone(timedelta(hours=9))
+DATABASE_ID = "0123456789abcdef0123456789abcdef"
+LABELS = ["SCHED", "RAR", "OS", "SMF", "YOUTUBE", "ETC", "M"]
+STATUSES = ["시작 전", "진행 중", "완료", "보류"]
+PRIORITIES = ["1", "2", "3", "4", "-"]
+
+
+# ==============================
+# ✅ Synthetic data
+# ==============================
+def _rich(text):
+    return [{"type": "text", "text": {"content": text}, "plain_text": text}]
+
+def make_page(page_id, title, start, end=None, labels=("ETC",), status="시작 전",
+              priority="-", eid=None, edited="2024-01-01T00:00:00.000Z"):
+    return {
+        "object": "page",
+        "id": page_id,
+        "created_time": "2024-01-01T00:00:00.000Z",
+        "last_edited_time": edited,
+        "archived": False,
+        "properties": {
+            "name": {"id": "title", "type": "title", "title": _rich(title)},
+            "states": {"id": "st", "type": "status", "status": {"name": status}},
+            "label": {"id": "lb", "type": "multi_select", "multi_select": [{"name": x} for x in labels]},
+            "priority": {"id": "pr", "type": "select", "select": {"name": priority}},
+            "date": {"id": "dt", "type": "date", "date": {"start": start, "end": end, "time_zone": None}},
+            "gcal_event_id": {"id": "ge", "type": "rich_text", "rich_text": _rich(eid) if eid else []},
+            # 봇이 읽지 않는 속성(실제 DB의 폭을 흉내)
+            "notes": {"id": "nt", "type": "rich_text", "rich_text": _rich("memo " * 20)},
+            "url": {"id": "ur", "type": "url", "url": "https://example.com/some/long/path"},
+        },
+    }
+
+def make_dataset(n_pages, n_events, base_date, seed=0):
+    """
+    - 페이지: 약 3년 전 ~ 90일 뒤에 흩어진 할 일, 5%는 기간 일정
+    - 일정: window(어제~내일) 안, 절반은 이미 노션에 SCHED 페이지가 있음
+    """
+    rnd = random.Random(seed)
+    pages = []
+    for i in range(n_pages):
+        start = base_date + timedelta(days=rnd.randint(-3 * 365, 90))
+        end = None
+        if rnd.random() < 0.05:
+            end = (start + timedelta(days=rnd.choice([2, 7, 30, 120]))).isoformat()
+        labels = rnd.sample(LABELS[1:], rnd.choice([1, 1, 2]))
+        pages.append(make_page(
+            f"page-{i:07d}", f"task {i}", start.isoformat(), end, labels,
+            rnd.choice(STATUSES), rnd.choice(PRIORITIES),
+        ))
+
+    events = []
+    for i in range(n_events):
+        day = base_date + timedelta(days=rnd.choice([-1, 0, 1]))
+        hour = rnd.randint(8, 20)
+        start = datetime(day.year, day.month, day.day, hour, 0, tzinfo=KST)
+        end = start + timedelta(minutes=rnd.choice([30, 60, 90]))
+        ev = {
+            "id": f"ev{i:05d}",
+            "status": "confirmed",
+            "summary": f"meeting {i}",
+            "start": {"dateTime": start.isoformat()},
+            "end": {"dateTime": end.isoformat()},
+        }
+        events.append(ev)
+        if i % 2 == 0:
+            pages.append(make_page(
+                f"sched-{i:05d}", f"meeting {i} old", start.isoformat(), end.isoformat(),
+                ["SCHED"], "시작 전", "-", eid=ev["id"],
+            ))
+    return pages, events
+
+
+# ==============================
+# ✅ Fake Notion filter
+# ==============================
+def _prop_text(prop):
+    arr = prop.get(prop["type"]) or []
+    return "".join(x.get("plain_text", "") for x in arr)
+
+def match_filter(page, f):
+    if not f:
+        return True
+    if "and" in f:
+        return all(match_filter(page, x) for x in f["and"])
+    if "or" in f:
+        return any(match_filter(page, x) for x in f["or"])
+    if f.get("timestamp") == "last_edited_time":
+        cond = f["last_edited_time"]
+        edited = datetime.fromisoformat(page["last_edited_time"].replace("Z", "+00:00"))
+        if "on_or_after" in cond:
+            return edited >= datetime.fromisoformat(cond["on_or_after"].replace("Z", "+00:00"))
+        return True
+
+    prop = page["properties"].get(f["property"])
+    if prop is None:
+        return False
+    if "date" in f:
+        cond = f["date"]
+        start = (prop["date"] or {}).get("start")
+        if cond.get("is_not_empty"):
+            return bool(start)
+        if not start:
+            return False
+        # Notion처럼 범위는 start 기준으로 비교
+        d = start[:10]
+        ok = True
+        if "on_or_after" in cond:
+            ok = ok and d >= cond["on_or_after"][:10]
+        if "on_or_before" in cond:
+            ok = ok and d <= cond["on_or_before"][:10]
+        if "before" in cond:
+            ok = ok and d < cond["before"][:10]
+        return ok
+    if "multi_select" in f:
+        names = {x["name"] for x in prop["multi_select"]}
+        cond = f["multi_select"]
+        if "contains" in cond:
+            return cond["contains"] in names
+        if "does_not_contain" in cond:
+            return cond["does_not_contain"] not in names
+    if "rich_text" in f:
+        cond = f["rich_text"]
+        text = _prop_text(prop)
+        if "equals" in cond:
+            return text == cond["equals"]
+        if cond.get("is_not_empty"):
+            return bool(text)
+    return True
+
+def project_properties(page, prop_ids):
+    if not prop_ids:
+        return page
+    out = dict(page)
+    out["properties"] = {k: v for k, v in page["properties"].items() if v["id"] in prop_ids or k in prop_ids}
+    return out
+
+
+# ==============================
+# ✅ Fake servers (별도 프로세스)
+# ==============================
+class FakeBackend:
+    def __init__(self):
+        self.reset([], [])
+
+    def reset(self, pages, events):
+        self.pages = {p["id"]: p for p in pages}
+        self.events = events
+        self.messages = {}
+        self.cursors = {}
+        self.stats = {}
+        self.seq = 0
+
+    def count(self, endpoint, bytes_in, bytes_out):
+        st = self.stats.setdefault(endpoint, {"calls": 0, "bytes_in": 0, "bytes_out": 0})
+        st["calls"] += 1
+        st["bytes_in"] += bytes_in
+        st["bytes_out"] += bytes_out
+
+    def now_iso(self):
+        return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:00.000Z")
+
+    # --- Notion ---
+    def notion_query(self, body, query):
+        size = min(int(body.get("page_size") or 100), 100)
+        cursor = body.get("start_cursor")
+        if cursor:
+            matched = self.cursors.pop(cursor)
+        else:
+            matched = [p for p in self.pages.values() if not p["archived"] and match_filter(p, body.get("filter"))]
+            for sort in reversed(body.get("sorts") or []):
+                # timestamp 정렬만 (probe가 last_edited_time desc 1건을 씀)
+                matched.sort(key=lambda p: p[sort["timestamp"]], reverse=sort.get("direction") == "descending")
+        chunk, rest = matched[:size], matched[size:]
+        next_cursor = None
+        if rest:
+            self.seq += 1
+            next_cursor = f"cursor-{self.seq}"
+            self.cursors[next_cursor] = rest
+        props = query.get("filter_properties") or []
+        return {
+            "object": "list",
+            "results": [project_properties(p, props) for p in chunk],
+            "has_more": bool(rest),
+            "next_cursor": next_cursor,
+        }
+
+    def _apply_props(self, page, props):
+        for name, value in props.items():
+            kind = next(iter(value))
+            prop = page["properties"].setdefault(name, {"id": name, "type": kind})
+            prop["type"] = kind
+            if kind in ("title", "rich_text"):
+                prop[kind] = [
+                    {"type": "text", "text": x["text"], "plain_text": x["text"]["content"]}
+                    for x in value[kind]
+                ]
+            else:
+                prop[kind] = value[kind]
+        page["last_edited_time"] = self.now_iso()
+
+    def notion_create(self, body):
+        self.seq += 1
+        page = make_page(f"new-{self.seq:07d}", "", None, edited=self.now_iso())
+        page["created_time"] = page["last_edited_time"]
+        self._apply_props(page, body.get("properties") or {})
+        self.pages[page["id"]] = page
+        return page
+
+    def notion_update(self, page_id, body):
+        page = self.pages[page_id]
+        if body.get("archived"):
+            page["archived"] = True
+            page["last_edited_time"] = self.now_iso()
+        if body.get("properties"):
+            self._apply_props(page, body["properties"])
+        return page
+
+    def notion_database(self, database_id):
+        sample = make_page("schema", "", None)
+        return {
+            "object": "database",
+            "id": database_id,
+            "properties": {
+                name: {"id": prop["id"], "name": name, "type": prop["type"]}
+                for name, prop in sample["properties"].items()
+            },
+        }
+
+    # --- Calendar ---
+    def gcal_list(self, query):
+        if "syncToken" in query:
+            return {"items": [], "nextSyncToken": "bench-token"}
+        time_min = datetime.fromisoformat(query["timeMin"][0])
+        time_max = datetime.fromisoformat(query["timeMax"][0])
+        items = [
+            ev for ev in self.events
+            if datetime.fromisoformat(ev["start"]["dateTime"]) < time_max
+            and datetime.fromisoformat(ev["end"]["dateTime"]) > time_min
+        ]
+        offset = int((query.get("pageToken") or ["0"])[0])
+        size = int((query.get("maxResults") or ["250"])[0])
+        page = items[offset:offset + size]
+        res = {"items": page}
+        if offset + size < len(items):
+            res["nextPageToken"] = str(offset + size)
+        else:
+            res["nextSyncToken"] = "bench-token"
+        return res
+
+
+def make_handler(backend):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _read(self):
+            n = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(n) if n else b""
+            return raw, (json.loads(raw) if raw else {})
+
+        def _send(self, endpoint, raw_in, obj, status=200):
+            out = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+            if endpoint:
+                backend.count(endpoint, len(raw_in), len(out))
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/__stats":
+                return self._send(None, b"", backend.stats)
+            if url.path.startswith("/calendar/v3/calendars/") and url.path.endswith("/events"):
+                return self._send("gcal.events.list", b"", backend.gcal_list(query))
+            if url.path.startswith("/v1/databases/"):
+                database_id = url.path.rsplit("/", 1)[-1]
+                return self._send("notion.databases.retrieve", b"", backend.notion_database(database_id))
+            self._send(None, b"", {"message": "not found"}, 404)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            raw, body = self._read()
+            if url.path == "/__reset":
+                pages, events = make_dataset(body["pages"], body["events"], date.fromisoformat(body["base"]))
+                backend.reset(pages, events)
+                return self._send(None, raw, {"ok": True})
+            if url.path.startswith("/v1/databases/") and url.path.endswith("/query"):
+                query = parse_qs(url.query)
+                return self._send("notion.query", raw, backend.notion_query(body, query))
+            if url.path == "/v1/pages":
+                return self._send("notion.pages.create", raw, backend.notion_create(body))
+            if url.path.startswith("/api/webhooks/"):
+                backend.seq += 1
+                msg_id = str(10 ** 17 + backend.seq)
+                backend.messages[msg_id] = body
+                return self._send("discord.post", raw, {"id": msg_id})
+            self._send(None, raw, {"message": "not found"}, 404)
+
+        def do_PATCH(self):
+            url = urlparse(self.path)
+            raw, body = self._read()
+            if url.path.startswith("/v1/pages/"):
+                page_id = url.path.rsplit("/", 1)[-1]
+                endpoint = "notion.pages.archive" if body.get("archived") else "notion.pages.update"
+                return self._send(endpoint, raw, backend.notion_update(page_id, body))
+            if url.path.startswith("/api/webhooks/"):
+                return self._send("discord.patch", raw, {"id": url.path.rsplit("/", 1)[-1]})
+            self._send(None, raw, {"message": "not found"}, 404)
+
+    return Handler
+
+def serve(port_queue):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(FakeBackend()))
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+# ==============================
+# ✅ Bench client
+# ==============================
+def start_server():
+    ctx = multiprocessing.get_context("spawn")
+    port_queue = ctx.Queue()
+    proc = ctx.Process(target=serve, args=(port_queue,), daemon=True)
+    proc.start()
+    return proc, f"http://127.0.0.1:{port_queue.get(timeout=30)}"
+
+def configure_script(base_url, state_file):
+    """
+    script.py를 로컬 서버로 향하게 설정하고 import
+    """
+    os.environ["NOTION_API_KEY"] = "bench"
+    os.environ["NOTION_DATABASE_ID"] = DATABASE_ID
+    os.environ["NOTION_API_BASE"] = f"{base_url}/v1"
+    os.environ["GCAL_ID"] = "bench@example.com"
+    os.environ["DISCORD_WEBHOOK_URL"] = f"{base_url}/api/webhooks/1/bench"
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import script
+    import httplib2
+    from googleapiclient.discovery import build
+
+    script.STATE_DB = state_file
+    script.RATE_LIMITS_AT_API = dict(script.RATE_LIMITS)
+    script.RATE_LIMITS.clear()  # 로컬 측정은 한도 없이, 한도 기준 시간은 따로 계산
+    script._new_gcal_service = lambda: build(
+        "calendar", "v3",
+        http=httplib2.Http(),
+        static_discovery=True,
+        client_options={"api_endpoint": f"{base_url}/calendar/v3/"},
+    )
+    return script
+
+def http_json(method, url, body=None):
+    import requests
+    resp = requests.request(method, url, json=body, timeout=600)
+    resp.raise_for_status()
+    return resp.json()
+
+def stats_delta(before, after):
+    out = {}
+    for endpoint, st in after.items():
+        prev = before.get(endpoint, {"calls": 0, "bytes_in": 0, "bytes_out": 0})
+        d = {k: st[k] - prev[k] for k in st}
+        if d["calls"]:
+            out[endpoint] = d
+    return out
+
+def min_seconds_at_api_limits(script, calls):
+    """
+    엔드포인트 호출 수를 실제 API 한도(초당 요청)로 나눈 최소 소요 시간(업스트림끼리는 병렬 가정)
+    """
+    per_upstream = {}
+    for endpoint, st in calls.items():
+        upstream = endpoint.split(".")[0]
+        per_upstream[upstream] = per_upstream.get(upstream, 0) + st["calls"]
+    worst = 0.0
+    for upstream, n in per_upstream.items():
+        rate, burst = script.RATE_LIMITS_AT_API.get(upstream, (None, 0))
+        if rate:
+            worst = max(worst, max(0, n - burst) / rate)
+    return worst
+
+def measure(script, base_url, name, fn):
+    before = http_json("GET", f"{base_url}/__stats")
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    wall = time.perf_counter() - t0
+    _cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    calls = stats_delta(before, http_json("GET", f"{base_url}/__stats"))
+    return result, {
+        "phase": name,
+        "wall_s": round(wall, 4),
+        "peak_mem_mb": round(peak / 1e6, 2),
+        "calls": calls,
+        "bytes": sum(st["bytes_in"] + st["bytes_out"] for st in calls.values()),
+        "min_s_at_api_limits": round(min_seconds_at_api_limits(script, calls), 1),
+    }
+
+def run_scenario(script, base_url, n_pages, n_events):
+    base_date = script.effective_date()
+    eff_str = base_date.strftime("%Y-%m-%d")
+    http_json("POST", f"{base_url}/__reset", {"pages": n_pages, "events": n_events, "base": base_date.isoformat()})
+
+    rows = []
+    state = {}
+    _, row = measure(script, base_url, "sync_gcal_to_notion (cold)", lambda: script.sync_gcal_to_notion(base_date, state))
+    rows.append(row)
+    summary, row = measure(script, base_url, "sync_gcal_to_notion (warm)", lambda: script.sync_gcal_to_notion(base_date, state))
+    rows.append(row)
+
+    _, row = measure(script, base_url, "fetch_notion_data_for_window (no cache)", lambda: script.fetch_notion_data_for_window(base_date))
+    rows.append(row)
+    _, row = measure(script, base_url, "fetch_notion_data_for_window (cold cache)", lambda: script.fetch_notion_data_for_window(base_date, {}))
+    rows.append(row)
+    # 주기적 full 재조회(장기 일정 조회는 따로 더 드물게 하므로 빠짐)
+    routine = json.loads(json.dumps(state))
+    routine["notion_cache"]["full_at"] = "2000-01-01T00:00:00+00:00"
+    _, row = measure(
+        script, base_url, "fetch_notion_data_for_window (full refresh)",
+        lambda: script.fetch_notion_data_for_window(base_date, routine),
+    )
+    rows.append(row)
+    data, row = measure(script, base_url, "fetch_notion_data_for_window (warm cache)", lambda: script.fetch_notion_data_for_window(base_date, state))
+    rows.append(row)
+    _, row = measure(
+        script, base_url, "fetch_notion_data_for_window (sync snapshot)",
+        lambda: script.fetch_notion_data_for_window(base_date, state, summary["snapshot"]),
+    )
+    rows.append(row)
+
+    _, row = measure(script, base_url, "create_discord_payload", lambda: script.create_discord_payload(data, eff_str))
+    rows.append(row)
+
+    for r in rows:
+        r["pages"] = n_pages
+        r["events"] = n_events
+    return rows
+
+def print_table(rows):
+    header = f"{'pages':>7} {'events':>6}  {'phase':<46} {'wall_s':>8} {'peak_MB':>8} {'calls':>6} {'KB':>9} {'api_min_s':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        n_calls = sum(st["calls"] for st in r["calls"].values())
+        print(
+            f"{r['pages']:>7} {r['events']:>6}  {r['phase']:<46} {r['wall_s']:>8.3f} "
+            f"{r['peak_mem_mb']:>8.2f} {n_calls:>6} {r['bytes'] / 1024:>9.1f} {r['min_s_at_api_limits']:>9.1f}"
+        )
+        for endpoint, st in sorted(r["calls"].items()):
+            print(f"{'':>17}  - {endpoint:<30} calls={st['calls']:<6} in={st['bytes_in']:<10} out={st['bytes_out']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="script.py 오프라인 벤치마크")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--events", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--json", action="store_true", help="표 대신 JSON 출력")
+    args = parser.parse_args(argv)
+
+    import tempfile
+    proc, base_url = start_server()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            script = configure_script(base_url, os.path.join(tmp, "state.sqlite3"))
+            rows = []
+            for n_pages in args.pages:
+                for n_events in args.events:
+                    rows.extend(run_scenario(script, base_url, n_pages, n_events))
+            script.close_http_sessions()
+            script.close_state_store()
+    finally:
+        proc.terminate()
+
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        print_table(rows)
+
+if __name__ == "__main__":
+    main()
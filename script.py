@@ -1,12 +1,27 @@
+import time
+_PROCESS_T0 = time.perf_counter()
+
 import os
 import json
 import re
+import hashlib
+import heapq
+import itertools
+import random
+import shutil
+import sqlite3
+import threading
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timezone, timedelta
+from urllib.parse import quote
 
-# Google Calendar
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+# Google Calendar 라이브러리는 무겁기 때문에 실제로 동기화할 때만 import (build_gcal_service)
 
 
 # ==============================
@@ -82,14 +97,242 @@ HIDDEN_LABELS = {"M"}
 
 PRIORITY_ORDER = ["1", "2", "3", "4", "-"]
 EMBED_COLOR = int("FF57CF", 16)
-STATE_FILE = "discord_state.json"
+
+# ✅ 상태 저장소(SQLite, WAL)
+STATE_DB = os.getenv("STATE_DB", "bot_state.sqlite3")
+# 파일 1개만 보존할 수 있는 환경용: 실행 끝에 압축 사본을 쓰고, STATE_DB가 없으면 여기서 복원
+STATE_EXPORT_FILE = os.getenv("STATE_EXPORT_FILE", "")
+# 예전 JSON 상태 파일(STATE_DB가 비어 있을 때 한 번 가져옴)
+LEGACY_STATE_FILE = "discord_state.json"
 
 # ✅ 캘린더 동기화 주기(분)
 GCAL_SYNC_EVERY_MINUTES = int(os.getenv("GCAL_SYNC_EVERY_MINUTES", "30"))
 
+# ✅ --daemon 모드에서 디스코드 메시지 갱신 주기(분)
+DISCORD_REFRESH_MINUTES = int(os.getenv("DISCORD_REFRESH_MINUTES", "5"))
+
 # ✅ 캘린더/노션 조회 범위(어제/오늘/내일)
 WINDOW_DAYS = [-1, 0, 1]
 
+# ✅ events.list 응답에서 받을 필드(notion_props_for_gcal_event / is_declined_for_me가 읽는 것만)
+GCAL_EVENT_FIELDS = (
+    "nextPageToken,nextSyncToken,"
+    "items(id,status,summary,start,end,attendees(email,self,responseStatus))"
+)
+GCAL_MAX_RESULTS = 2500
+
+# ✅ window 이전에 시작해 window까지 이어지는 장기 일정을 찾을 범위(일)
+NOTION_RANGE_LOOKBACK_DAYS = int(os.getenv("NOTION_RANGE_LOOKBACK_DAYS", "90"))
+
+# ✅ 노션 페이지 캐시: 전체 재조회 주기(분) / delta 조회 여유(분, last_edited_time은 분 단위)
+NOTION_CACHE_FULL_REFRESH_MINUTES = int(os.getenv("NOTION_CACHE_FULL_REFRESH_MINUTES", "180"))
+NOTION_CACHE_SLACK_MINUTES = 5
+
+# ✅ lookback보다 먼저 시작해 아직 진행 중인 기간 일정 조회 주기(분, 0이면 안 함)
+#    (floor 이전 전체를 훑는 쿼리라 full 재조회와 따로 드물게)
+NOTION_LONG_RANGE_SCAN_MINUTES = int(os.getenv("NOTION_LONG_RANGE_SCAN_MINUTES", "1440"))
+
+# ✅ 노션 쓰기 큐: 실패한 쓰기를 다음 실행에서 재시도하는 최대 횟수
+NOTION_OUTBOX_MAX_ATTEMPTS = int(os.getenv("NOTION_OUTBOX_MAX_ATTEMPTS", "5"))
+
+# ✅ 변경 확인(probe)에서 바뀐 게 없어도 이 시간(분)마다 한 번은 전체 실행
+#    (캐시는 delta만 갱신하므로 노션에서 직접 삭제한 페이지는 여기가 아니라
+#     NOTION_CACHE_FULL_REFRESH_MINUTES마다의 전체 재조회에서 빠짐 — probe도 그때는 실행시킴)
+PROBE_MAX_SKIP_MINUTES = int(os.getenv("PROBE_MAX_SKIP_MINUTES", "60"))
+
+# ✅ 노션 DB 스키마(속성 타입) 캐시 유지 시간(분)
+NOTION_SCHEMA_TTL_MINUTES = int(os.getenv("NOTION_SCHEMA_TTL_MINUTES", "1440"))
+
+# ✅ gcal_event_id 배치 조회 시 OR 필터 하나에 넣을 id 수
+GCAL_LOOKUP_BATCH = 50
+
+
+# ✅ Notion API 주소(벤치마크용 로컬 서버로 바꿀 때만 설정)
+NOTION_API_BASE = os.getenv("NOTION_API_BASE", "https://api.notion.com/v1").rstrip("/")
+
+# ✅ HTTP 커넥션 풀(업스트림별 keep-alive 세션)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+
+# ✅ API별 요청 한도(토큰 버킷): (초당 요청 수, 버스트)
+RATE_LIMITS = {
+    "notion": (float(os.getenv("NOTION_RATE_PER_SEC", "3")), 3),
+    "gcal": (float(os.getenv("GCAL_RATE_PER_SEC", "5")), 5),
+    "discord": (2.5, 5),  # 웹훅: 2초당 5회
+}
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "5"))
+RETRY_BASE_DELAY = 0.5   # 초
+RETRY_MAX_DELAY = 30.0   # 초
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# ✅ 노션 쓰기(생성/수정/아카이브) 동시 실행 수 — 실제 속도는 RATE_LIMITS가 제한
+NOTION_WORKERS = int(os.getenv("NOTION_WORKERS", "4"))
+
+# ✅ 실행 지표 파일(비우면 stdout 한 줄만 출력)
+METRICS_JSON_FILE = os.getenv("METRICS_JSON_FILE", "")
+METRICS_PROM_FILE = os.getenv("METRICS_PROM_FILE", "")  # node_exporter textfile collector용
+
+
+# ==============================
+# ✅ Startup timing
+# ==============================
+_startup_marks = {}
+
+def mark_startup(name: str):
+    """
+    프로세스 시작부터 name 시점까지 걸린 시간(처음 한 번만 기록)
+    """
+    if name not in _startup_marks:
+        _startup_marks[name] = time.perf_counter() - _PROCESS_T0
+
+def startup_report() -> str:
+    parts = [f"{name}={sec:.3f}s" for name, sec in _startup_marks.items()]
+    return "⏱️ Startup: " + " ".join(parts)
+
+mark_startup("imports")
+
+
+# ==============================
+# ✅ Run metrics (phase timers / API counters)
+# ==============================
+_metrics_lock = threading.Lock()
+_metrics = {}
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+        _metrics.update({"phases": {}, "endpoints": {}, "outcomes": {}})
+
+reset_metrics()
+
+@contextmanager
+def phase_timer(name: str):
+    """
+    with 블록 시간을 phase별로 누적
+    (source가 여러 개면 동시에 돈 시간도 합산되므로 wall time보다 클 수 있음)
+    """
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        with _metrics_lock:
+            phase = _metrics["phases"].setdefault(name, {"seconds": 0.0, "count": 0})
+            phase["seconds"] += elapsed
+            phase["count"] += 1
+
+def timed(name: str, fn, *args, **kwargs):
+    """
+    phase_timer로 감싼 fn 호출 (asyncio.to_thread에 넘기기용)
+    """
+    with phase_timer(name):
+        return fn(*args, **kwargs)
+
+def count_request(endpoint: str, **deltas):
+    """
+    엔드포인트별 카운터: requests / retries / throttled(429) / errors / bytes_sent / bytes_received / seconds
+    """
+    with _metrics_lock:
+        counters = _metrics["endpoints"].setdefault(endpoint, {
+            "requests": 0, "retries": 0, "throttled": 0, "errors": 0,
+            "bytes_sent": 0, "bytes_received": 0, "seconds": 0.0,
+        })
+        for key, value in deltas.items():
+            counters[key] += value
+
+def count_outcomes(group: str, **deltas):
+    """
+    결과 개수 (예: pages created/updated/skipped/archived/deduped, messages edited/...)
+    """
+    with _metrics_lock:
+        counters = _metrics["outcomes"].setdefault(group, {})
+        for key, value in deltas.items():
+            counters[key] = counters.get(key, 0) + value
+
+def metrics_snapshot(run_seconds: float, ok: bool) -> dict:
+    with _metrics_lock:
+        snap = json.loads(json.dumps(_metrics))
+    snap["run_seconds"] = round(run_seconds, 3)
+    snap["ok"] = ok
+    snap["finished_at"] = datetime.now(timezone.utc).isoformat()
+    for phase in snap["phases"].values():
+        phase["seconds"] = round(phase["seconds"], 3)
+    for counters in snap["endpoints"].values():
+        counters["seconds"] = round(counters["seconds"], 3)
+    return snap
+
+def _prom_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+def prometheus_text(snap: dict) -> str:
+    """
+    마지막 실행 지표를 Prometheus text format으로 (모두 gauge: 실행마다 덮어씀)
+    """
+    lines = []
+
+    def _metric(name, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            label_str = ",".join(f'{k}="{_prom_label(v)}"' for k, v in labels.items())
+            lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+
+    _metric("alert_bot_run_seconds", "Wall time of the last run.", [({}, snap["run_seconds"])])
+    _metric("alert_bot_run_success", "1 if the last run finished without errors.", [({}, int(snap["ok"]))])
+    _metric(
+        "alert_bot_last_run_timestamp_seconds", "Unix time the last run finished.",
+        [({}, round(datetime.fromisoformat(snap["finished_at"]).timestamp(), 3))],
+    )
+    _metric(
+        "alert_bot_phase_seconds", "Seconds spent per phase in the last run.",
+        [({"phase": name}, p["seconds"]) for name, p in sorted(snap["phases"].items())],
+    )
+    for key, help_text in (
+        ("requests", "HTTP requests sent per endpoint (including retries)."),
+        ("retries", "Retried requests per endpoint."),
+        ("throttled", "429 / rate limited responses per endpoint."),
+        ("errors", "Connection errors per endpoint."),
+        ("bytes_sent", "Request body bytes per endpoint."),
+        ("bytes_received", "Response body bytes per endpoint."),
+        ("seconds", "Seconds waiting on responses per endpoint."),
+    ):
+        _metric(
+            f"alert_bot_api_{key}", help_text,
+            [({"endpoint": ep}, c[key]) for ep, c in sorted(snap["endpoints"].items())],
+        )
+    _metric(
+        "alert_bot_outcomes", "Result counts (pages / messages) in the last run.",
+        [
+            ({"group": group, "result": result}, n)
+            for group, counters in sorted(snap["outcomes"].items())
+            for result, n in sorted(counters.items())
+        ],
+    )
+    return "\n".join(lines) + "\n"
+
+def _write_atomic(path: str, text: str):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def export_metrics(run_seconds: float, ok: bool):
+    """
+    실행 끝에 지표 출력: stdout에 JSON 한 줄 + (설정 시) JSON 파일 / Prometheus textfile
+    """
+    snap = metrics_snapshot(run_seconds, ok)
+    raw = json.dumps(snap, ensure_ascii=False, separators=(",", ":"))
+    print(f"📈 Metrics: {raw}")
+    try:
+        if METRICS_JSON_FILE:
+            _write_atomic(METRICS_JSON_FILE, raw + "\n")
+        if METRICS_PROM_FILE:
+            _write_atomic(METRICS_PROM_FILE, prometheus_text(snap))
+    except OSError as e:
+        print(f"⚠️ Failed to write metrics: {e!r}")
+    return snap
+
 
 # ==============================
 # ✅ Utils
@@ -148,18 +391,276 @@ def date_ranges_overlap(a_start, a_end, b_start, b_end) -> bool:
 # ==============================
 # ✅ STATE 저장/로드
 # ==============================
-def load_state():
-    if not os.path.exists(STATE_FILE):
-        return {}
+# scope: ""(최상위) / "sources/<name>" / "destinations/<name>"
+# - 노션 페이지 캐시 / 이벤트 인덱스는 행 단위 테이블, 나머지 키는 state_kv에 JSON으로
+# - 스키마 버전은 PRAGMA user_version, 버전 N으로 올리는 문장은 STATE_MIGRATIONS[N - 1]
+STATE_MIGRATIONS = [
+    [
+        """CREATE TABLE state_kv (
+            scope TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,
+            PRIMARY KEY (scope, key)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE notion_pages (
+            scope TEXT NOT NULL, page_id TEXT NOT NULL, page TEXT NOT NULL,
+            PRIMARY KEY (scope, page_id)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE gcal_page_index (
+            scope TEXT NOT NULL, event_id TEXT NOT NULL, page_id TEXT NOT NULL,
+            PRIMARY KEY (scope, event_id)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE gcal_events (
+            scope TEXT NOT NULL, event_id TEXT NOT NULL, start_at TEXT NOT NULL, end_at TEXT NOT NULL,
+            PRIMARY KEY (scope, event_id)
+        ) WITHOUT ROWID""",
+    ],
+    [
+        """CREATE TABLE notion_outbox (
+            database_id TEXT NOT NULL, target TEXT NOT NULL, op TEXT NOT NULL,
+            page_id TEXT, event_id TEXT, props TEXT NOT NULL, idem_key TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0, last_error TEXT, queued_at TEXT NOT NULL,
+            PRIMARY KEY (database_id, target)
+        ) WITHOUT ROWID""",
+    ],
+]
+STATE_GROUPS = ("sources", "destinations")
+
+_state_conn = None
+_state_lock = threading.RLock()
+# 마지막으로 읽거나 쓴 값(scope -> key -> 값) — 저장할 때 바뀐 키만 씀
+_state_saved = {}
+
+class TrackedPages(dict):
+    """
+    노션 캐시 pages(dict) — 마지막 저장 이후 바뀐/지운 page_id를 기억
+    (캐시 코드가 쓰는 pages[id] = ... / pages.pop(id) 만 추적)
+    """
+    def __init__(self, *args, scope=None):
+        super().__init__(*args)
+        self.scope = scope
+        self.dirty = set()
+        self.deleted = set()
+
+    def __setitem__(self, page_id, page):
+        super().__setitem__(page_id, page)
+        self.dirty.add(page_id)
+        self.deleted.discard(page_id)
+
+    def __delitem__(self, page_id):
+        super().__delitem__(page_id)
+        self.dirty.discard(page_id)
+        self.deleted.add(page_id)
+
+    def pop(self, page_id, *default):
+        if page_id in self:
+            self.dirty.discard(page_id)
+            self.deleted.add(page_id)
+        return super().pop(page_id, *default)
+
+@contextmanager
+def _state_tx(conn):
+    conn.execute("BEGIN IMMEDIATE")
     try:
-        with open(STATE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+def _migrate_state_db(conn):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version > len(STATE_MIGRATIONS):
+        raise RuntimeError(
+            f"{STATE_DB} 스키마 버전({version})이 이 스크립트({len(STATE_MIGRATIONS)})보다 새롭습니다."
+        )
+    for target in range(version + 1, len(STATE_MIGRATIONS) + 1):
+        with _state_tx(conn):
+            for statement in STATE_MIGRATIONS[target - 1]:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {target}")
+
+def state_db():
+    """
+    상태 DB 연결(프로세스 안에서 하나) — 없으면 STATE_EXPORT_FILE에서 복원
+    """
+    global _state_conn
+    with _state_lock:
+        if _state_conn is not None:
+            return _state_conn
+        if not os.path.exists(STATE_DB) and STATE_EXPORT_FILE and os.path.exists(STATE_EXPORT_FILE):
+            shutil.copyfile(STATE_EXPORT_FILE, STATE_DB)
+        conn = sqlite3.connect(STATE_DB, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _migrate_state_db(conn)
+        _state_conn = conn
+        return conn
+
+def close_state_store():
+    """
+    WAL을 본 파일에 합치고 닫음(+ STATE_EXPORT_FILE 설정 시 압축 사본 쓰기)
+    """
+    global _state_conn
+    with _state_lock:
+        if _state_conn is None:
+            return
+        try:
+            _state_conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            if STATE_EXPORT_FILE:
+                export_state(STATE_EXPORT_FILE)
+        finally:
+            _state_conn.close()
+            _state_conn = None
+
+def export_state(path: str):
+    """
+    상태 DB를 VACUUM INTO로 빈 공간 없는 단일 파일로 복사(원자적 교체)
+    """
+    tmp = f"{path}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    with _state_lock:
+        state_db().execute("VACUUM INTO ?", (tmp,))
+    os.replace(tmp, path)
+
+def _state_scopes(state: dict):
+    """
+    state dict -> [(scope, dict)]
+    """
+    top = {k: v for k, v in state.items() if k not in STATE_GROUPS}
+    scopes = [("", top)]
+    for group in STATE_GROUPS:
+        for name, sub in (state.get(group) or {}).items():
+            scopes.append((f"{group}/{name}", sub))
+    return scopes
+
+def _scope_dict(state: dict, scope: str) -> dict:
+    if not scope:
+        return state
+    group, name = scope.split("/", 1)
+    return state.setdefault(group, {}).setdefault(name, {})
+
+def _read_state_db(conn) -> dict:
+    state = {}
+    _state_saved.clear()
+    for scope, key, value in conn.execute("SELECT scope, key, value FROM state_kv"):
+        data = json.loads(value)
+        if key == "notion_cache":
+            data["pages"] = TrackedPages(scope=scope)
+        _scope_dict(state, scope)[key] = data
+        _state_saved.setdefault(scope, {})[key] = value
+
+    for scope, page_id, page in conn.execute("SELECT scope, page_id, page FROM notion_pages"):
+        cache = _scope_dict(state, scope).get("notion_cache")
+        if cache is not None:
+            dict.__setitem__(cache["pages"], page_id, json.loads(page))
+
+    for scope, event_id, page_id in conn.execute("SELECT scope, event_id, page_id FROM gcal_page_index"):
+        _scope_dict(state, scope).setdefault("gcal_page_index", {})[event_id] = page_id
+    for scope, event_id, start_at, end_at in conn.execute(
+        "SELECT scope, event_id, start_at, end_at FROM gcal_events"
+    ):
+        _scope_dict(state, scope).setdefault("gcal_events", {})[event_id] = [start_at, end_at]
+
+    for scope, _data in _state_scopes(state):
+        saved = _state_saved.setdefault(scope, {})
+        for key in ("gcal_page_index", "gcal_events"):
+            if key in _data:
+                saved[key] = dict(_data[key])
+    return state
+
+def _save_notion_pages(conn, scope: str, cache: dict):
+    """
+    바뀐 페이지만 upsert / delete
+    (full 갱신으로 pages가 새 dict가 된 경우에만 scope 전체를 다시 씀)
+    """
+    pages = cache.get("pages") or {}
+    if isinstance(pages, TrackedPages) and pages.scope == scope:
+        upserts = [(scope, pid, json.dumps(pages[pid], ensure_ascii=False)) for pid in pages.dirty]
+        deletes = [(scope, pid) for pid in pages.deleted]
+    else:
+        conn.execute("DELETE FROM notion_pages WHERE scope = ?", (scope,))
+        upserts = [(scope, pid, json.dumps(p, ensure_ascii=False)) for pid, p in pages.items()]
+        deletes = []
+        pages = TrackedPages(pages, scope=scope)
+        cache["pages"] = pages
+    conn.executemany("DELETE FROM notion_pages WHERE scope = ? AND page_id = ?", deletes)
+    conn.executemany("INSERT OR REPLACE INTO notion_pages VALUES (?, ?, ?)", upserts)
+    pages.dirty.clear()
+    pages.deleted.clear()
+
+def _save_scope(conn, scope: str, data: dict):
+    saved = _state_saved.setdefault(scope, {})
+
+    for key in set(saved) - set(data):
+        conn.execute("DELETE FROM state_kv WHERE scope = ? AND key = ?", (scope, key))
+        if key == "notion_cache":
+            conn.execute("DELETE FROM notion_pages WHERE scope = ?", (scope,))
+        elif key in ("gcal_page_index", "gcal_events"):
+            conn.execute(f"DELETE FROM {key} WHERE scope = ?", (scope,))
+        saved.pop(key)
+
+    for key, value in data.items():
+        if key in ("gcal_page_index", "gcal_events"):
+            # window 안 일정 수만큼이라 작음 -> 바뀌었으면 통째로 다시 씀
+            if saved.get(key) == value:
+                continue
+            conn.execute(f"DELETE FROM {key} WHERE scope = ?", (scope,))
+            if key == "gcal_page_index":
+                conn.executemany(
+                    "INSERT INTO gcal_page_index VALUES (?, ?, ?)",
+                    [(scope, eid, page_id) for eid, page_id in value.items()],
+                )
+            else:
+                conn.executemany(
+                    "INSERT INTO gcal_events VALUES (?, ?, ?, ?)",
+                    [(scope, eid, start_at, end_at) for eid, (start_at, end_at) in value.items()],
+                )
+            saved[key] = dict(value)
+            continue
+
+        if key == "notion_cache":
+            _save_notion_pages(conn, scope, value)
+            value = {k: v for k, v in value.items() if k != "pages"}
+
+        raw = json.dumps(value, ensure_ascii=False, sort_keys=True)
+        if saved.get(key) != raw:
+            conn.execute("INSERT OR REPLACE INTO state_kv VALUES (?, ?, ?)", (scope, key, raw))
+            saved[key] = raw
+
+def load_state():
+    """
+    STATE_DB에서 state dict 복원
+    - DB가 비어 있고 예전 discord_state.json이 있으면 한 번 가져와서 저장
+    """
+    with _state_lock:
+        conn = state_db()
+        state = _read_state_db(conn)
+        if state or not os.path.exists(LEGACY_STATE_FILE):
+            return state
+        try:
+            with open(LEGACY_STATE_FILE, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except Exception:
+            return {}
+        save_state(state)
+        print(f"ℹ️ Imported {LEGACY_STATE_FILE} into {STATE_DB}")
+        return state
 
 def save_state(state: dict):
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump(state, f, ensure_ascii=False, indent=2)
+    """
+    마지막 저장 이후 바뀐 키 / 캐시 페이지만 한 트랜잭션으로 씀
+    (캐시가 커져도 저장 비용은 바뀐 양에 비례)
+    """
+    with _state_lock:
+        conn = state_db()
+        with _state_tx(conn):
+            live_scopes = set()
+            for scope, data in _state_scopes(state):
+                live_scopes.add(scope)
+                _save_scope(conn, scope, data)
+            for scope in set(_state_saved) - live_scopes:
+                _save_scope(conn, scope, {})
+                _state_saved.pop(scope, None)
 
 def should_run_gcal_sync(state: dict, now: datetime) -> bool:
     """
@@ -182,6 +683,204 @@ def mark_gcal_synced(state: dict, now: datetime):
     state["last_gcal_sync_at"] = now.astimezone(timezone.utc).isoformat()
 
 
+# ==============================
+# ✅ Rate limit (token bucket + retry)
+# ==============================
+_rate_buckets = {}
+_rate_lock = threading.Lock()
+
+def _rate_bucket(upstream: str, burst: int):
+    bucket = _rate_buckets.get(upstream)
+    if bucket is None:
+        bucket = {"tokens": float(burst), "updated": time.monotonic(), "blocked_until": 0.0}
+        _rate_buckets[upstream] = bucket
+    return bucket
+
+def rate_limit_acquire(upstream: str):
+    """
+    업스트림 버킷에서 토큰 1개를 꺼낼 때까지 대기
+    - 429로 막힌 동안(blocked_until)은 모든 스레드가 함께 대기
+    """
+    if upstream not in RATE_LIMITS:
+        return
+    rate, burst = RATE_LIMITS[upstream]
+    while True:
+        with _rate_lock:
+            bucket = _rate_bucket(upstream, burst)
+            now = time.monotonic()
+            bucket["tokens"] = min(float(burst), bucket["tokens"] + (now - bucket["updated"]) * rate)
+            bucket["updated"] = now
+
+            wait = bucket["blocked_until"] - now
+            if wait <= 0:
+                if bucket["tokens"] >= 1:
+                    bucket["tokens"] -= 1
+                    return
+                wait = (1 - bucket["tokens"]) / rate
+        time.sleep(wait)
+
+def rate_limit_pause(upstream: str, seconds: float):
+    if upstream not in RATE_LIMITS or seconds <= 0:
+        return
+    _rate, burst = RATE_LIMITS[upstream]
+    with _rate_lock:
+        bucket = _rate_bucket(upstream, burst)
+        bucket["blocked_until"] = max(bucket["blocked_until"], time.monotonic() + seconds)
+        bucket["tokens"] = 0.0
+
+def retry_after_seconds(value):
+    """
+    Retry-After 헤더(초 또는 HTTP-date)를 초로 변환(없거나 이상하면 None)
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        dt = parsedate_to_datetime(value)
+        return max(0.0, (dt - datetime.now(timezone.utc)).total_seconds())
+    except Exception:
+        return None
+
+def honor_rate_limit_headers(upstream: str, resp):
+    """
+    Discord식 버킷 헤더: 남은 요청이 0이면 리셋될 때까지 업스트림을 멈춤
+    """
+    if resp.headers.get("X-RateLimit-Remaining") != "0":
+        return
+    reset_after = retry_after_seconds(resp.headers.get("X-RateLimit-Reset-After"))
+    if reset_after:
+        rate_limit_pause(upstream, reset_after)
+
+def backoff_delay(attempt: int) -> float:
+    cap = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt))
+    return random.uniform(cap / 2, cap)
+
+
+def run_concurrently(fn, items, max_workers=None):
+    """
+    items 각각에 fn을 워커 풀에서 실행
+    - 하나가 실패해도 나머지는 계속 진행
+    - 입력 순서대로 [(item, result, error)] 반환
+    """
+    items = list(items)
+    if not items:
+        return []
+    workers = max(1, min(max_workers or NOTION_WORKERS, len(items)))
+
+    out = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(fn, item) for item in items]
+        for item, fut in zip(items, futures):
+            try:
+                out.append((item, fut.result(), None))
+            except Exception as e:
+                out.append((item, None, e))
+    return out
+
+
+# ==============================
+# ✅ HTTP client (pooled sessions)
+# ==============================
+_http_sessions = {}
+_http_sessions_lock = threading.Lock()
+
+def _new_http_session(upstream: str):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if upstream == "notion":
+        session.headers.update(notion_headers())
+    return session
+
+def http_session(upstream: str):
+    """
+    업스트림(notion / discord)별로 keep-alive 세션 1개를 만들어 재사용
+    - 같은 실행 안의 요청들은 TCP/TLS 연결을 공유
+    - notion 세션은 인증 헤더를 생성 시 한 번만 읽어서 고정
+    """
+    with _http_sessions_lock:
+        session = _http_sessions.get(upstream)
+        if session is None:
+            session = _new_http_session(upstream)
+            _http_sessions[upstream] = session
+        return session
+
+def _request_not_sent(err) -> bool:
+    """
+    연결 자체가 안 된 실패인지(서버가 요청을 받았을 수 없음) — 접속 타임아웃 / 접속 거부 / DNS 실패
+    """
+    if isinstance(err, requests.ConnectTimeout):
+        return True
+    reason = err.args[0] if err.args else None
+    reason = getattr(reason, "reason", reason)
+    return isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+def http_request(upstream: str, method: str, url: str, endpoint=None, idempotent=True, **kwargs):
+    """
+    레이트리밋을 지키면서 요청
+    - 429: Retry-After 만큼 업스트림 전체를 멈춘 뒤 재시도
+    - 5xx / 연결 실패 / 타임아웃 / 응답이 중간에 끊김: 지터 백오프 후 재시도
+    - idempotent=False(페이지 생성처럼 두 번 가면 두 개가 생기는 요청): 서버가 받았을 수 있는
+      5xx / 보낸 뒤 끊긴 연결 / 응답 대기 타임아웃은 재시도하지 않음(429와 접속 실패만) — 재시도는 outbox가 일정 id로 먼저 찾아본 뒤
+    - HTTP_MAX_RETRIES를 넘기면 마지막 응답을 그대로 반환(raise_for_status는 호출부에서)
+    - endpoint: 지표 이름(예: notion.pages.update), 없으면 upstream.method
+    """
+    kwargs.setdefault("timeout", (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+    endpoint = endpoint or f"{upstream}.{method.lower()}"
+    attempt = 0
+    while True:
+        rate_limit_acquire(upstream)
+        t0 = time.perf_counter()
+        try:
+            resp = http_session(upstream).request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            count_request(
+                endpoint, requests=1, errors=1, retries=int(attempt > 0),
+                seconds=time.perf_counter() - t0,
+            )
+            if attempt >= HTTP_MAX_RETRIES or not (idempotent or _request_not_sent(e)):
+                raise
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+            continue
+
+        count_request(
+            endpoint,
+            requests=1,
+            retries=int(attempt > 0),
+            throttled=int(resp.status_code == 429),
+            bytes_sent=len(resp.request.body or b""),
+            bytes_received=len(resp.content),
+            seconds=time.perf_counter() - t0,
+        )
+        mark_startup(f"first_{upstream}_response")
+        honor_rate_limit_headers(upstream, resp)
+        if resp.status_code not in RETRYABLE_STATUS or attempt >= HTTP_MAX_RETRIES:
+            return resp
+        if not idempotent and resp.status_code != 429:
+            return resp
+
+        delay = retry_after_seconds(resp.headers.get("Retry-After"))
+        if delay is None:
+            delay = backoff_delay(attempt)
+        if resp.status_code == 429:
+            rate_limit_pause(upstream, delay)
+        else:
+            time.sleep(delay)
+        attempt += 1
+
+def close_http_sessions():
+    with _http_sessions_lock:
+        for session in _http_sessions.values():
+            session.close()
+        _http_sessions.clear()
+
+
 # ==============================
 # ✅ Notion API helpers
 # ==============================
@@ -202,61 +901,326 @@ def get_database_id():
         raise ValueError("NOTION_DATABASE_ID가 비어있습니다.")
     return database_id
 
-def query_notion_database(filter_payload=None):
-    database_id = get_database_id()
-    url = f"https://api.notion.com/v1/databases/{database_id}/query"
-    headers = notion_headers()
+def notion_filter_properties_query(database_id: str, properties) -> str:
+    """
+    filter_properties 쿼리스트링(속성 id 기준)
+    - 스키마를 읽은 적 없는 DB면 id를 모르므로 "" (전체 속성을 받음)
+    """
+    prop_ids = _notion_prop_ids.get(database_id)
+    if not properties or not prop_ids:
+        return ""
+    ids = [prop_ids[name] for name in properties if name in prop_ids]
+    # 속성 id는 이미 URL 인코딩된 문자열이라 %는 그대로 둠
+    return "?" + "&".join(f"filter_properties={quote(pid, safe='%')}" for pid in ids)
+
+def iter_notion_database(filter_payload=None, database_id=None, properties=None, sorts=None, page_size=100):
+    """
+    쿼리 결과를 100개 배치가 올 때마다 한 페이지씩 yield(전체를 모아두지 않음)
+    - properties: 받을 속성 이름들(filter_properties) — 나머지 속성은 응답에서 빠짐
+    - 앞의 몇 개만 필요하면 page_size를 줄이고 generator를 중간에 버리면 됨
+    """
+    database_id = database_id or get_database_id()
+    url = f"{NOTION_API_BASE}/databases/{database_id}/query"
+    url += notion_filter_properties_query(database_id, properties)
 
-    all_results = []
     start_cursor = None
 
     while True:
-        payload = {"page_size": 100}
+        payload = {"page_size": page_size}
         if filter_payload:
             payload["filter"] = filter_payload
+        if sorts:
+            payload["sorts"] = sorts
         if start_cursor:
             payload["start_cursor"] = start_cursor
 
-        resp = requests.post(url, headers=headers, json=payload)
+        resp = http_request("notion", "POST", url, endpoint="notion.databases.query", json=payload)
         resp.raise_for_status()
         data = resp.json()
 
-        all_results.extend(data.get("results", []))
-        if data.get("has_more"):
-            start_cursor = data.get("next_cursor")
-        else:
-            break
+        yield from data.get("results", [])
+        if not data.get("has_more"):
+            return
+        start_cursor = data.get("next_cursor")
 
-    return all_results
+def query_notion_database(filter_payload=None, database_id=None, properties=None):
+    return list(iter_notion_database(filter_payload, database_id, properties))
 
-def create_notion_page(props: dict):
-    url = "https://api.notion.com/v1/pages"
-    headers = notion_headers()
+def create_notion_page(props: dict, database_id=None):
+    url = f"{NOTION_API_BASE}/pages"
     payload = {
-        "parent": {"database_id": get_database_id()},
+        "parent": {"database_id": database_id or get_database_id()},
         "properties": props
     }
-    resp = requests.post(url, headers=headers, json=payload)
+    resp = http_request("notion", "POST", url, endpoint="notion.pages.create", idempotent=False, json=payload)
     resp.raise_for_status()
     return resp.json()
 
 def update_notion_page(page_id: str, props: dict):
-    url = f"https://api.notion.com/v1/pages/{page_id}"
-    headers = notion_headers()
+    url = f"{NOTION_API_BASE}/pages/{page_id}"
     payload = {"properties": props}
-    resp = requests.patch(url, headers=headers, json=payload)
+    resp = http_request("notion", "PATCH", url, endpoint="notion.pages.update", json=payload)
     resp.raise_for_status()
     return resp.json()
 
 def archive_notion_page(page_id: str):
-    url = f"https://api.notion.com/v1/pages/{page_id}"
-    headers = notion_headers()
+    url = f"{NOTION_API_BASE}/pages/{page_id}"
     payload = {"archived": True}
-    resp = requests.patch(url, headers=headers, json=payload)
+    resp = http_request("notion", "PATCH", url, endpoint="notion.pages.archive", json=payload)
+    resp.raise_for_status()
+    return resp.json()
+
+def retrieve_notion_database(database_id=None):
+    url = f"{NOTION_API_BASE}/databases/{database_id or get_database_id()}"
+    resp = http_request("notion", "GET", url, endpoint="notion.databases.retrieve")
     resp.raise_for_status()
     return resp.json()
 
 
+# ==============================
+# ✅ Notion schema (속성 타입 캐시)
+# ==============================
+# 캘린더 동기화가 쓰는 속성과 허용 타입(priority는 있으면 씀)
+SYNC_PROP_TYPES = {
+    TITLE_PROP: ("title",),
+    STATUS_PROP: ("status", "select"),
+    CATEGORY_PROP: ("multi_select",),
+    DATE_PROP: ("date",),
+    GCAL_EVENT_ID_PROP: ("rich_text",),
+}
+OPTIONAL_PROP_TYPES = {
+    PRIORITY_PROP: ("select",),
+}
+
+def check_notion_schema(prop_types: dict, database_id: str):
+    """
+    필요한 속성이 없거나 타입이 다르면 어떤 속성인지 알려주고 바로 실패
+    """
+    problems = []
+    for name, allowed in SYNC_PROP_TYPES.items():
+        actual = prop_types.get(name)
+        if actual is None:
+            problems.append(f"'{name}' 속성이 없습니다({' / '.join(allowed)} 필요)")
+        elif actual not in allowed:
+            problems.append(f"'{name}' 속성 타입이 {actual}입니다({' / '.join(allowed)} 필요)")
+    for name, allowed in OPTIONAL_PROP_TYPES.items():
+        actual = prop_types.get(name)
+        if actual is not None and actual not in allowed:
+            problems.append(f"'{name}' 속성 타입이 {actual}입니다({' / '.join(allowed)} 필요)")
+    if problems:
+        raise ValueError(f"노션 DB({database_id}) 설정 확인: " + "; ".join(problems))
+
+# database_id -> {속성 이름: 속성 id} (filter_properties용, load_notion_schema가 채움)
+_notion_prop_ids = {}
+
+def load_notion_schema(state: dict, database_id=None, check=False) -> dict:
+    """
+    DB 속성 이름 -> 타입({"states": "status", ...})
+    - state["notion_schema"]에 NOTION_SCHEMA_TTL_MINUTES 동안 캐시(같은 DB일 때만)
+    - 속성 id도 같이 저장(filter_properties용)
+    - check=True(캘린더 동기화)면 check_notion_schema로 검사
+    """
+    database_id = database_id or get_database_id()
+    cached = state.get("notion_schema") or {}
+    fetched_at = parse_iso_to_kst_dt(cached.get("fetched_at"))
+    if not (
+        cached.get("database_id") == database_id
+        and cached.get("ids") is not None
+        and fetched_at
+        and datetime.now(timezone.utc) - fetched_at < timedelta(minutes=NOTION_SCHEMA_TTL_MINUTES)
+    ):
+        db = retrieve_notion_database(database_id)
+        props = db.get("properties") or {}
+        cached = {
+            "database_id": database_id,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "properties": {name: prop.get("type") for name, prop in props.items()},
+            "ids": {name: prop.get("id") for name, prop in props.items() if prop.get("id")},
+        }
+        state["notion_schema"] = cached
+
+    _notion_prop_ids[database_id] = cached["ids"]
+    if check:
+        check_notion_schema(cached["properties"], database_id)
+    return cached["properties"]
+
+def status_prop_payload(prop_types: dict, name: str) -> dict:
+    """
+    states 값 payload — DB 타입(status / select)에 맞춰 한 번에
+    """
+    return {STATUS_PROP: {prop_types.get(STATUS_PROP, "status"): {"name": name}}}
+
+
+# ==============================
+# ✅ Notion write queue (outbox)
+# ==============================
+# - 생성/수정/아카이브는 먼저 상태 DB의 notion_outbox에 기록한 뒤 보냄
+# - 대상(page_id, 생성은 event:<gcal_event_id>)마다 한 줄: 새 쓰기는 대기 중인 쓰기와 합쳐짐
+# - 실패한 줄은 남겨뒀다가 다음 실행에서 다시 보냄(중간에 죽어도 잃지 않음)
+OUTBOX_COLUMNS = ("target", "op", "page_id", "event_id", "props", "idem_key", "attempts", "last_error", "queued_at")
+
+def notion_write(op: str, page_id=None, event_id=None, props=None) -> dict:
+    """
+    쓰기 1건(op: create / update / archive)
+    """
+    return {
+        "op": op,
+        "target": page_id or f"event:{event_id}",
+        "page_id": page_id,
+        "event_id": event_id,
+        "props": props or {},
+        "attempts": 0,
+    }
+
+def idempotency_key(write: dict) -> str:
+    """
+    같은 대상에 같은 내용이면 같은 키 — 보내는 동안 새 쓰기가 합쳐졌는지 구분하는 데 씀
+    """
+    raw = json.dumps([write["op"], write["target"], write["props"]], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+def coalesce_notion_write(old, new: dict) -> dict:
+    """
+    대기 중인 쓰기(old)에 새 쓰기(new)를 합침
+    - archive는 대기 중인 수정을 대체하고, archive 뒤에 온 수정은 버림
+    - create/update + update는 속성별로 나중 값이 이김(create는 create로 남음)
+    """
+    if old is None or new["op"] == "archive":
+        return new
+    if old["op"] == "archive":
+        return old
+    merged = dict(old)
+    merged["props"] = {**old["props"], **new["props"]}
+    merged["event_id"] = new.get("event_id") or old.get("event_id")
+    return merged
+
+def _outbox_row(database_id: str, write: dict):
+    return (
+        database_id, write["target"], write["op"], write["page_id"], write["event_id"],
+        json.dumps(write["props"], ensure_ascii=False), idempotency_key(write),
+        write.get("attempts", 0), write.get("last_error"),
+        write.get("queued_at") or datetime.now(timezone.utc).isoformat(),
+    )
+
+def _outbox_write(row) -> dict:
+    write = dict(zip(OUTBOX_COLUMNS, row))
+    write["props"] = json.loads(write["props"])
+    return write
+
+def pending_notion_writes(database_id: str, ops=None) -> list:
+    with _state_lock:
+        rows = state_db().execute(
+            f"SELECT {', '.join(OUTBOX_COLUMNS)} FROM notion_outbox WHERE database_id = ? ORDER BY queued_at",
+            (database_id,),
+        ).fetchall()
+    writes = [_outbox_write(row) for row in rows]
+    return [w for w in writes if ops is None or w["op"] in ops]
+
+def enqueue_notion_writes(database_id: str, writes):
+    """
+    쓰기들을 한 트랜잭션으로 큐에 기록(같은 대상은 합침)
+    """
+    with _state_lock:
+        conn = state_db()
+        with _state_tx(conn):
+            for write in writes:
+                row = conn.execute(
+                    f"SELECT {', '.join(OUTBOX_COLUMNS)} FROM notion_outbox WHERE database_id = ? AND target = ?",
+                    (database_id, write["target"]),
+                ).fetchone()
+                merged = coalesce_notion_write(_outbox_write(row) if row else None, write)
+                conn.execute(
+                    "INSERT OR REPLACE INTO notion_outbox VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    _outbox_row(database_id, merged),
+                )
+
+def revise_notion_writes(database_id: str, revisions):
+    """
+    대기 중인 쓰기 정리 [(write, props)] — props가 None이면 삭제, 아니면 그 속성으로 교체
+    (읽은 뒤 새 쓰기가 합쳐진 줄은 idem_key가 달라서 건드리지 않음)
+    """
+    with _state_lock:
+        conn = state_db()
+        with _state_tx(conn):
+            for write, props in revisions:
+                key = (database_id, write["target"], write["idem_key"])
+                if props is None:
+                    conn.execute(
+                        "DELETE FROM notion_outbox WHERE database_id = ? AND target = ? AND idem_key = ?", key
+                    )
+                    continue
+                revised = {**write, "props": props}
+                conn.execute(
+                    "UPDATE notion_outbox SET props = ?, idem_key = ? "
+                    "WHERE database_id = ? AND target = ? AND idem_key = ?",
+                    (json.dumps(props, ensure_ascii=False), idempotency_key(revised), *key),
+                )
+
+def send_notion_write(write: dict, database_id: str):
+    """
+    쓰기 1건 전송(http_request라서 레이트리밋/재시도 적용) -> 페이지 JSON
+    - 이전에 보낸 적 있는 create(실패했거나, 성공 직후 죽어서 큐에 남은 것)는 실제로는 만들어졌을 수
+      있으므로 gcal_event_id로 먼저 찾아보고, 있으면 그 페이지를 수정(같은 일정이 두 번 생기지 않게)
+    """
+    if write["op"] == "archive":
+        return archive_notion_page(write["page_id"])
+    if write["op"] == "update":
+        return update_notion_page(write["page_id"], write["props"])
+
+    if write["attempts"] and write["event_id"]:
+        found = find_pages_by_gcal_event_ids([write["event_id"]], database_id).get(write["event_id"])
+        if found:
+            keep, _dups = split_pages_keep_oldest(found)
+            return update_notion_page(keep["id"], write["props"])
+    return create_notion_page(write["props"], database_id)
+
+def _is_permanent_write_error(err) -> bool:
+    resp = getattr(err, "response", None)
+    return resp is not None and resp.status_code in (400, 404)
+
+def drain_notion_outbox(database_id: str, ops=None):
+    """
+    대기 중인 쓰기를 병렬로 보내고(속도는 RATE_LIMITS) [(write, page, error)] 반환
+    - 성공: 큐에서 삭제(보내는 동안 새 쓰기가 합쳐졌으면 idem_key가 달라서 남음)
+    - 400/404(다시 보내도 안 됨) 또는 NOTION_OUTBOX_MAX_ATTEMPTS 도달: 경고를 남기고 삭제
+    - 그 외 실패: 남겨두고 다음 실행에서 재시도
+    - attempts는 보내기 전에 올려서 커밋(보낸 뒤 삭제 전에 죽어도 다음 실행이 "보낸 적 있음"을 앎)
+    """
+    writes = pending_notion_writes(database_id, ops)
+    if not writes:
+        return []
+    with _state_lock:
+        conn = state_db()
+        with _state_tx(conn):
+            for write in writes:
+                conn.execute(
+                    "UPDATE notion_outbox SET attempts = attempts + 1 "
+                    "WHERE database_id = ? AND target = ? AND idem_key = ?",
+                    (database_id, write["target"], write["idem_key"]),
+                )
+    results = run_concurrently(lambda w: send_notion_write(w, database_id), writes)
+
+    with _state_lock:
+        conn = state_db()
+        with _state_tx(conn):
+            for write, _page, err in results:
+                key = (database_id, write["target"], write["idem_key"])
+                attempts = write["attempts"] + 1
+                if err is not None and not _is_permanent_write_error(err) and attempts < NOTION_OUTBOX_MAX_ATTEMPTS:
+                    conn.execute(
+                        "UPDATE notion_outbox SET last_error = ? "
+                        "WHERE database_id = ? AND target = ? AND idem_key = ?",
+                        (repr(err)[:500], *key),
+                    )
+                    continue
+                if err is not None:
+                    print(f"⚠️ Dropped Notion {write['op']} for {write['target']} after {attempts} attempt(s): {err!r}")
+                conn.execute(
+                    "DELETE FROM notion_outbox WHERE database_id = ? AND target = ? AND idem_key = ?", key
+                )
+    return results
+
+
 # ==============================
 # ✅ Safe getters
 # ==============================
@@ -297,6 +1261,12 @@ def safe_get_status_name(page):
         return prop["select"]["name"] if prop["select"] else None
     return None
 
+def is_sched_page(page) -> bool:
+    return any(
+        (name or "").strip().upper() == "SCHED"
+        for name in safe_get_multi_select_names(page, CATEGORY_PROP)
+    )
+
 def safe_get_rich_text(page, prop_name):
     prop = page["properties"].get(prop_name)
     if not prop:
@@ -328,6 +1298,15 @@ def safe_get_date_range(page):
 
     return (None, None)
 
+def safe_get_date_raw(page):
+    """
+    Notion date의 (start, end) 원본 문자열
+    """
+    prop = page["properties"].get(DATE_PROP)
+    if not prop or prop["type"] != "date" or not prop["date"]:
+        return (None, None)
+    return (prop["date"].get("start"), prop["date"].get("end"))
+
 def safe_get_date_start_dt_kst(page):
     """
     Notion date.start를 datetime(KST)로 가져옴(없으면 None)
@@ -340,89 +1319,480 @@ def safe_get_date_start_dt_kst(page):
 
 
 # ==============================
-# ✅ Google Calendar -> Notion Sync
+# ✅ Task record (페이지 1회 파싱)
 # ==============================
-def build_gcal_service():
-    raw = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON")
-    if not raw:
-        raise ValueError("GOOGLE_SERVICE_ACCOUNT_JSON이 비어있습니다.")
-    info = json.loads(raw)
-    scopes = ["https://www.googleapis.com/auth/calendar.readonly"]
-    creds = service_account.Credentials.from_service_account_info(info, scopes=scopes)
-    return build("calendar", "v3", credentials=creds, cache_discovery=False)
+NO_START_DT = datetime(2100, 1, 1, tzinfo=KST)
 
-def fetch_gcal_events_for_date(service, calendar_id: str, date_obj):
-    start_dt, end_dt = day_bounds_kst(date_obj)
-    time_min = start_dt.astimezone(timezone.utc).isoformat()
-    time_max = end_dt.astimezone(timezone.utc).isoformat()
+@dataclass(slots=True)
+class TaskRecord:
+    """
+    렌더/그룹핑에 필요한 값만 미리 파싱해 둔 페이지
+    """
+    page_id: str
+    title: str
+    status: str
+    labels: tuple           # 정규화된(대문자) 전체 라벨
+    categories: tuple       # 그중 디스코드에 표시할 카테고리(CATEGORY_ORDER, 중복 제거)
+    priority: str
+    priority_rank: int
+    start_date: object      # date
+    end_date: object        # date
+    start_dt: datetime      # SCHED 정렬 키(없으면 NO_START_DT)
+
+def decode_task(page):
+    """
+    페이지 JSON -> TaskRecord (날짜 / 제목이 없으면 None)
+    """
+    start_d, end_d = safe_get_date_range(page)
+    if not start_d or not end_d:
+        return None
+    title = safe_get_title(page)
+    if not title:
+        return None
 
-    events = []
-    page_token = None
-    while True:
-        res = service.events().list(
-            calendarId=calendar_id,
-            timeMin=time_min,
-            timeMax=time_max,
-            singleEvents=True,
-            orderBy="startTime",
-            showDeleted=False,
-            pageToken=page_token
-        ).execute()
+    display_categories = {cat for cat, _ in CATEGORY_ORDER}
+    labels = []
+    for category in safe_get_multi_select_names(page, CATEGORY_PROP):
+        normalized = (category or "").strip().upper()
+        if normalized:
+            labels.append(normalized)
+    labels = tuple(dict.fromkeys(labels))
+
+    # ETC를 직접 선택한 경우에만 ETC로 표시
+    # 숨김 라벨 / 알 수 없는 라벨만 있으면 표시 안 함
+    categories = tuple(
+        label for label in labels
+        if label not in HIDDEN_LABELS and label in display_categories
+    )
+
+    priority = safe_get_select_name(page, PRIORITY_PROP)
+    return TaskRecord(
+        page_id=page["id"],
+        title=title,
+        status=safe_get_status_name(page),
+        labels=labels,
+        categories=categories,
+        priority=priority,
+        priority_rank=priority_rank(priority),
+        start_date=start_d,
+        end_date=end_d,
+        start_dt=safe_get_date_start_dt_kst(page) or NO_START_DT,
+    )
+
+
+class TaskIntervalIndex:
+    """
+    TaskRecord 날짜 범위에 대한 정적 interval tree(centered)
+    - active_on(d): d가 [start, end] 안에 있는 task
+    - overlapping(a, b): [a, b]와 겹치는 task
+    둘 다 O(log n + k), 결과는 넣은 순서대로(정렬 안정성 유지)
+    """
+    __slots__ = ("_root", "_size")
 
-        events.extend(res.get("items", []))
-        page_token = res.get("nextPageToken")
-        if not page_token:
-            break
-    return events
+    def __init__(self, tasks):
+        items = [
+            (t.start_date.toordinal(), t.end_date.toordinal(), seq, t)
+            for seq, t in enumerate(tasks)
+        ]
+        self._size = len(items)
+        self._root = self._build(items)
 
-def is_declined_for_me(ev) -> bool:
+    def __len__(self):
+        return self._size
+
+    @classmethod
+    def _build(cls, items):
+        if not items:
+            return None
+        endpoints = sorted(x for s, e, _seq, _t in items for x in (s, e))
+        center = endpoints[len(endpoints) // 2]
+
+        left, mid, right = [], [], []
+        for item in items:
+            if item[1] < center:
+                left.append(item)
+            elif item[0] > center:
+                right.append(item)
+            else:
+                mid.append(item)
+
+        by_start = sorted(mid, key=lambda x: x[0])
+        by_end = sorted(mid, key=lambda x: x[1], reverse=True)
+        return (center, by_start, by_end, cls._build(left), cls._build(right))
+
+    def overlapping(self, a, b):
+        a, b = a.toordinal(), b.toordinal()
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            center, by_start, by_end, left, right = node
+            if b < center:
+                for item in by_start:
+                    if item[0] > b:
+                        break
+                    found.append(item)
+                stack.append(left)
+            elif a > center:
+                for item in by_end:
+                    if item[1] < a:
+                        break
+                    found.append(item)
+                stack.append(right)
+            else:
+                found.extend(by_start)
+                stack.append(left)
+                stack.append(right)
+        found.sort(key=lambda x: x[2])
+        return [item[3] for item in found]
+
+    def active_on(self, target_date):
+        return self.overlapping(target_date, target_date)
+
+
+# ==============================
+# ✅ Notion page cache (last_edited_time delta)
+# ==============================
+CACHED_PROPS = (TITLE_PROP, STATUS_PROP, CATEGORY_PROP, PRIORITY_PROP, DATE_PROP, GCAL_EVENT_ID_PROP)
+
+def compact_page(page):
     """
-    내가 '참석하지 않음' 누른 일정은 제외
-    - 가장 정확: GCAL_OWNER_EMAIL로 내 이메일 지정
-    - 대체: attendees 중 self=True가 있고 declined면 제외
+    캐시에 저장할 최소 형태(봇이 읽는 속성만)
     """
-    attendees = ev.get("attendees") or []
-    my_email = (os.getenv("GCAL_OWNER_EMAIL") or "").strip().lower()
+    props = page.get("properties") or {}
+    return {
+        "id": page["id"],
+        "created_time": page.get("created_time"),
+        "last_edited_time": page.get("last_edited_time"),
+        "properties": {k: props[k] for k in CACHED_PROPS if k in props},
+    }
 
-    for a in attendees:
-        email = (a.get("email") or "").strip().lower()
-        status = (a.get("responseStatus") or "").strip().lower()
-        is_self = bool(a.get("self"))
+def notion_cache_floor(base_date_obj):
+    """
+    캐시가 담는 범위의 시작일(window 시작 - NOTION_RANGE_LOOKBACK_DAYS - 1일)
+    - 그보다 먼저 시작했어도 끝이 floor 이후인 장기 일정은 캐시에 남김
+      (NOTION_LONG_RANGE_SCAN_MINUTES마다 따로 조회)
+    """
+    window_start = base_date_obj + timedelta(days=min(WINDOW_DAYS))
+    return window_start - timedelta(days=NOTION_RANGE_LOOKBACK_DAYS + 1)
 
-        if status == "declined":
-            if my_email and email == my_email:
-                return True
-            if is_self:
-                return True
+def _cache_keeps(page, floor) -> bool:
+    if page.get("archived") or page.get("in_trash"):
+        return False
+    start_d, end_d = safe_get_date_range(page)
+    return bool(start_d) and (start_d >= floor or (end_d is not None and end_d >= floor))
 
-    return False
+def _needs_full_refresh(cache: dict, floor, now_utc: datetime) -> bool:
+    if not cache.get("high_water") or not cache.get("full_at"):
+        return True
+    # lookback을 늘리면 캐시에 없는 과거 범위가 생김
+    if parse_date_yyyy_mm_dd(cache.get("floor")) is None or parse_date_yyyy_mm_dd(cache["floor"]) > floor:
+        return True
+    full_at = parse_iso_to_kst_dt(cache["full_at"])
+    if not full_at:
+        return True
+    return (now_utc - full_at).total_seconds() >= NOTION_CACHE_FULL_REFRESH_MINUTES * 60
 
-def parse_gcal_datetime(value: str):
-    if not value:
-        return None
-    try:
-        return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(KST)
-    except Exception:
-        return None
+def _needs_long_range_scan(cache: dict, now_utc: datetime) -> bool:
+    if NOTION_LONG_RANGE_SCAN_MINUTES <= 0:
+        return False
+    scanned_at = parse_iso_to_kst_dt(cache.get("long_range_at"))
+    if not scanned_at:
+        return True
+    return (now_utc - scanned_at).total_seconds() >= NOTION_LONG_RANGE_SCAN_MINUTES * 60
 
-def notion_props_for_gcal_event(ev):
+def notion_cache_due(cache: dict, floor, now_utc: datetime) -> bool:
     """
-    - name: '제목 2pm' 형태
-    - label: SCHED (multi_select)
-    - states: 시작 전 / 진행 중 / 완료 (현재시간 기준 자동)
-    - priority: -
-    - date: 시간 있는 일정이면 datetime range 저장, all-day면 date만 저장
-    - gcal_event_id: ev["id"]
+    full 재조회나 장기 일정 조회 차례인지(probe가 건너뛰지 않게)
     """
-    summary = ev.get("summary") or "(제목 없음)"
+    return _needs_full_refresh(cache, floor, now_utc) or _needs_long_range_scan(cache, now_utc)
 
-    start = ev.get("start", {})
-    end = ev.get("end", {})
+def _is_long_range(page, floor) -> bool:
+    start_d, _end_d = safe_get_date_range(page)
+    return bool(start_d) and start_d < floor
 
-    start_dt = None
-    end_dt = None
+def notion_cache_partitions(base_date_obj, floor):
+    """
+    full 조회를 start 날짜 기준으로 겹치지 않게 나눈 필터들(각각 따로 페이지네이션 -> 병렬)
+    [floor, window 시작) / [window 시작, window 끝+2일) / [window 끝+2일, ...)
+    """
+    window_start, _window_end, window_end_plus1 = sync_window(base_date_obj)
+    cuts = [floor, window_start, window_end_plus1 + timedelta(days=1)]
+    filters = []
+    for i, lower in enumerate(cuts):
+        conds = [{"property": DATE_PROP, "date": {"on_or_after": lower.strftime("%Y-%m-%d")}}]
+        if i + 1 < len(cuts):
+            conds.append({"property": DATE_PROP, "date": {"before": cuts[i + 1].strftime("%Y-%m-%d")}})
+        filters.append({"and": conds})
+    return filters
+
+def query_notion_date_partitions(filters, floor, database_id=None):
+    """
+    커서는 순차라서 한 쿼리 안에서는 병렬이 안 되므로, 범위를 나눈 쿼리들을 동시에 돌림
+    - 배치가 오는 대로 캐시 형태(compact_page)로 줄여서 원본 JSON은 쌓지 않음
+    """
+    def _fetch(f):
+        return [
+            compact_page(p)
+            for p in iter_notion_database(f, database_id, CACHED_PROPS)
+            if _cache_keeps(p, floor)
+        ]
 
-    if start.get("dateTime"):
+    results = run_concurrently(_fetch, filters)
+    pages = []
+    for _f, res, err in results:
+        if err is not None:
+            raise err
+        pages.extend(res)
+    return pages
+
+def refresh_notion_cache(state: dict, base_date_obj, database_id=None):
+    """
+    state["notion_cache"]를 최신으로 맞추고 캐시된 페이지 목록 반환
+    - 처음/주기적으로: floor 이후 날짜가 있는 페이지 전체(full)
+    - 그 외: high_water 이후 수정된 페이지만 가져와 병합(delta)
+    - NOTION_LONG_RANGE_SCAN_MINUTES마다: floor 이전에 시작해 아직 안 끝난 기간 일정
+      (그 사이 full 때는 이전 캐시의 것을 그대로 가져감)
+    - 아카이브/날짜 삭제/floor 이전에 끝나게 된 페이지는 제거
+      (노션에서 직접 지운 페이지는 delta로 안 보이므로 다음 full(장기 일정은 다음 장기 조회) 때 정리됨)
+    """
+    floor = notion_cache_floor(base_date_obj)
+    now_utc = datetime.now(timezone.utc)
+    cache = state.get("notion_cache") or {}
+    load_notion_schema(state, database_id)  # filter_properties용 속성 id
+
+    if _needs_full_refresh(cache, floor, now_utc):
+        fetched = query_notion_date_partitions(
+            notion_cache_partitions(base_date_obj, floor), floor, database_id
+        )
+        pages = {p["id"]: p for p in fetched}
+        for page_id, page in (cache.get("pages") or {}).items():
+            if _is_long_range(page, floor):
+                pages.setdefault(page_id, page)
+        cache = {"full_at": now_utc.isoformat(), "long_range_at": cache.get("long_range_at")}
+    else:
+        since = parse_iso_to_kst_dt(cache["high_water"]) - timedelta(minutes=NOTION_CACHE_SLACK_MINUTES)
+        pages = cache.get("pages") or {}
+        for page in iter_notion_database({
+            "timestamp": "last_edited_time",
+            "last_edited_time": {"on_or_after": since.astimezone(timezone.utc).isoformat()},
+        }, database_id, CACHED_PROPS):
+            if _cache_keeps(page, floor):
+                pages[page["id"]] = compact_page(page)
+            else:
+                pages.pop(page["id"], None)
+
+    if _needs_long_range_scan(cache, now_utc):
+        fetched = query_notion_date_partitions(
+            [{"property": DATE_PROP, "date": {"before": floor.strftime("%Y-%m-%d")}}], floor, database_id
+        )
+        for page_id in [pid for pid, p in pages.items() if _is_long_range(p, floor)]:
+            pages.pop(page_id)
+        for page in fetched:
+            pages[page["id"]] = page
+        cache["long_range_at"] = now_utc.isoformat()
+
+    for page_id in [pid for pid, p in pages.items() if not _cache_keeps(p, floor)]:
+        pages.pop(page_id)
+
+    cache["floor"] = floor.strftime("%Y-%m-%d")
+    cache["high_water"] = now_utc.isoformat()
+    cache["pages"] = pages
+    state["notion_cache"] = cache
+    return list(pages.values())
+
+
+# ==============================
+# ✅ Google Calendar -> Notion Sync
+# ==============================
+# 서비스 객체의 httplib2.Http는 스레드 안전하지 않으므로 스레드마다 하나(인증 정보만 공유)
+_gcal_local = threading.local()
+_gcal_lock = threading.Lock()
+_gcal_creds = None
+
+def _gcal_credentials():
+    global _gcal_creds
+    with _gcal_lock:
+        if _gcal_creds is not None:
+            return _gcal_creds
+        raw = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON")
+        if not raw:
+            raise ValueError("GOOGLE_SERVICE_ACCOUNT_JSON이 비어있습니다.")
+        info = json.loads(raw)
+
+        from google.oauth2 import service_account
+        mark_startup("gcal_imports")
+
+        scopes = ["https://www.googleapis.com/auth/calendar.readonly"]
+        _gcal_creds = service_account.Credentials.from_service_account_info(info, scopes=scopes)
+        return _gcal_creds
+
+def _new_gcal_service():
+    from googleapiclient.discovery import build
+    return build("calendar", "v3", credentials=_gcal_credentials(), cache_discovery=False)
+
+def build_gcal_service():
+    """
+    Calendar 서비스 객체(스레드마다 한 번만 생성 — source들이 동시에 캘린더를 불러도 안전)
+    - google 라이브러리 import도 여기서 처음 함(캘린더 동기화 안 하는 실행은 비용 0)
+    """
+    service = getattr(_gcal_local, "service", None)
+    if service is None:
+        service = _new_gcal_service()
+        _gcal_local.service = service
+        mark_startup("gcal_service")
+    return service
+
+def _gcal_retryable(err) -> bool:
+    status = err.resp.status
+    if status in RETRYABLE_STATUS:
+        return True
+    if status == 403:
+        body = (err.content or b"").decode("utf-8", "ignore").lower()
+        return "ratelimitexceeded" in body
+    return False
+
+def gcal_execute(request, endpoint="gcal.request"):
+    """
+    googleapiclient 요청을 gcal 버킷에 맞춰 실행(429/5xx/rateLimitExceeded 재시도)
+    """
+    from googleapiclient.errors import HttpError
+
+    # 응답 본문 크기는 postproc(파싱 직전)에서 셈
+    received = [0]
+    postproc = request.postproc
+
+    def _count_body(resp, content):
+        received[0] = len(content or b"")
+        return postproc(resp, content)
+
+    request.postproc = _count_body
+
+    attempt = 0
+    while True:
+        rate_limit_acquire("gcal")
+        t0 = time.perf_counter()
+        received[0] = 0
+        try:
+            res = request.execute()
+            count_request(
+                endpoint, requests=1, retries=int(attempt > 0),
+                bytes_sent=len(request.body or ""), bytes_received=received[0],
+                seconds=time.perf_counter() - t0,
+            )
+            mark_startup("first_gcal_response")
+            return res
+        except HttpError as e:
+            count_request(
+                endpoint, requests=1, retries=int(attempt > 0),
+                throttled=int(e.resp.status == 429 or (e.resp.status == 403 and _gcal_retryable(e))),
+                bytes_received=len(e.content or b""),
+                seconds=time.perf_counter() - t0,
+            )
+            if attempt >= HTTP_MAX_RETRIES or not _gcal_retryable(e):
+                raise
+            delay = retry_after_seconds(e.resp.get("retry-after"))
+            if delay is None:
+                delay = backoff_delay(attempt)
+            if e.resp.status == 429:
+                rate_limit_pause("gcal", delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+
+def list_gcal_events(service, calendar_id: str, **params):
+    """
+    events.list 페이지네이션을 끝까지 돌고 (items, nextSyncToken) 반환
+    - nextSyncToken은 마지막 페이지에만 들어있음
+    - fields로 sync에서 실제로 읽는 필드만 받음
+    """
+    events = []
+    page_token = None
+    while True:
+        res = gcal_execute(service.events().list(
+            calendarId=calendar_id,
+            singleEvents=True,
+            maxResults=GCAL_MAX_RESULTS,
+            fields=GCAL_EVENT_FIELDS,
+            pageToken=page_token,
+            **params
+        ), endpoint="gcal.events.list")
+
+        events.extend(res.get("items", []))
+        page_token = res.get("nextPageToken")
+        if not page_token:
+            return events, res.get("nextSyncToken")
+
+def fetch_gcal_events_for_window(service, calendar_id: str, window_start, window_end_plus1):
+    """
+    [window_start 00:00, window_end_plus1 00:00) KST 범위 일정을 한 번에 -> (items, nextSyncToken)
+    - 여러 날에 걸친 일정도 1번만 옴
+    - syncToken 요청과 파라미터를 맞추려고 orderBy/showDeleted는 넣지 않음(정렬은 렌더 단계에서)
+    """
+    start_dt, _ = day_bounds_kst(window_start)
+    end_dt, _ = day_bounds_kst(window_end_plus1)
+    return list_gcal_events(
+        service,
+        calendar_id,
+        timeMin=start_dt.astimezone(timezone.utc).isoformat(),
+        timeMax=end_dt.astimezone(timezone.utc).isoformat(),
+    )
+
+def fetch_gcal_events_incremental(service, calendar_id: str, sync_token: str):
+    """
+    지난 동기화 이후 바뀐 일정만 (삭제/취소 포함) -> (items, nextSyncToken)
+    토큰이 만료되면 410 Gone(HttpError)이 올라감
+    """
+    return list_gcal_events(service, calendar_id, syncToken=sync_token)
+
+def is_gcal_sync_token_expired(err) -> bool:
+    return err.resp.status == 410
+
+def is_declined_for_me(ev) -> bool:
+    """
+    내가 '참석하지 않음' 누른 일정은 제외
+    - 가장 정확: GCAL_OWNER_EMAIL로 내 이메일 지정
+    - 대체: attendees 중 self=True가 있고 declined면 제외
+    """
+    attendees = ev.get("attendees") or []
+    my_email = (os.getenv("GCAL_OWNER_EMAIL") or "").strip().lower()
+
+    for a in attendees:
+        email = (a.get("email") or "").strip().lower()
+        status = (a.get("responseStatus") or "").strip().lower()
+        is_self = bool(a.get("self"))
+
+        if status == "declined":
+            if my_email and email == my_email:
+                return True
+            if is_self:
+                return True
+
+    return False
+
+def parse_gcal_datetime(value: str):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(KST)
+    except Exception:
+        return None
+
+def gcal_event_bounds(ev):
+    """
+    일정의 (start_dt, end_dt) KST
+    - all-day는 00:00 기준(end는 구글처럼 다음날 00:00, exclusive)
+    - end가 없으면 start + 1시간
+    """
+    start = ev.get("start", {})
+    end = ev.get("end", {})
+
+    start_dt = None
+    end_dt = None
+
+    if start.get("dateTime"):
         start_dt = parse_gcal_datetime(start.get("dateTime"))
     elif start.get("date"):
         sd = parse_date_yyyy_mm_dd(start.get("date"))
@@ -439,20 +1809,102 @@ def notion_props_for_gcal_event(ev):
     if start_dt and not end_dt:
         end_dt = start_dt + timedelta(hours=1)
 
+    return start_dt, end_dt
+
+def gcal_status_for_bounds(start_dt, end_dt, now_kst=None):
+    """
+    시작 전 / 진행 중 / 완료 (현재시간 기준)
+    """
+    if not start_dt or not end_dt:
+        return "시작 전"
+    now_kst = now_kst or kst_now()
+    if now_kst < start_dt:
+        return "시작 전"
+    if start_dt <= now_kst < end_dt:
+        return "진행 중"
+    return "완료"
+
+def gcal_next_transition(start_dt, end_dt, now_kst):
+    """
+    now 이후 states가 바뀌는 시각(시작 전 -> 진행 중: start, 진행 중 -> 완료: end), 없으면 None
+    """
+    if not start_dt or not end_dt:
+        return None
+    if now_kst < start_dt:
+        return start_dt
+    if now_kst < end_dt:
+        return end_dt
+    return None
+
+def schedule_status_transition(heap: list, eid: str, start_dt, end_dt, now_kst):
+    """
+    다음 states 전환을 [unix 시각, eid]로 힙에 추가(같은 항목이 이미 있으면 생략)
+    """
+    at = gcal_next_transition(start_dt, end_dt, now_kst)
+    if at is None:
+        return
+    entry = [at.timestamp(), eid]
+    if entry not in heap:
+        heapq.heappush(heap, entry)
+
+def pop_due_transitions(heap: list, known_bounds: dict, now_kst) -> set:
+    """
+    now까지 도래한 전환의 eid들을 힙에서 꺼내고, 각 일정의 다음 전환을 다시 넣음
+    - 일정이 사라졌거나 시간이 바뀐 항목(start/end와 시각이 안 맞음)은 버림
+    """
+    due = set()
+    now_ts = now_kst.timestamp()
+    while heap and heap[0][0] <= now_ts:
+        at_ts, eid = heapq.heappop(heap)
+        bounds = known_bounds.get(eid)
+        if not bounds:
+            continue
+        start_dt, end_dt = parse_iso_to_kst_dt(bounds[0]), parse_iso_to_kst_dt(bounds[1])
+        if not start_dt or not end_dt or at_ts not in (start_dt.timestamp(), end_dt.timestamp()):
+            continue
+        due.add(eid)
+        schedule_status_transition(heap, eid, start_dt, end_dt, now_kst)
+    return due
+
+def next_status_transition_at(state: dict):
+    """
+    가장 빠른 예정 전환 시각(KST), 없으면 None
+    """
+    heap = state.get("gcal_transitions")
+    if not heap:
+        return None
+    return datetime.fromtimestamp(heap[0][0], KST)
+
+def gcal_event_in_window(ev, window_start, window_end_plus1) -> bool:
+    """
+    일정이 [window_start 00:00, window_end_plus1 00:00) 와 겹치면 True (events.list timeMin/timeMax와 같은 기준)
+    """
+    start_dt, end_dt = gcal_event_bounds(ev)
+    if not start_dt or not end_dt:
+        return False
+    w_start, _ = day_bounds_kst(window_start)
+    w_end, _ = day_bounds_kst(window_end_plus1)
+    return start_dt < w_end and end_dt > w_start
+
+def notion_props_for_gcal_event(ev, prop_types: dict):
+    """
+    - name: '제목 2pm' 형태
+    - label: SCHED (multi_select)
+    - states: 시작 전 / 진행 중 / 완료 (현재시간 기준 자동, DB 타입에 맞춰 status 또는 select)
+    - priority: - (DB에 priority가 있을 때만)
+    - date: 시간 있는 일정이면 datetime range 저장, all-day면 date만 저장
+    - gcal_event_id: ev["id"]
+    """
+    summary = ev.get("summary") or "(제목 없음)"
+
+    start = ev.get("start", {})
+    start_dt, end_dt = gcal_event_bounds(ev)
+
     title = summary
     if start.get("dateTime") and start_dt:
         title = f"{summary} {format_time_kst(start_dt)}"
 
-    now_kst = kst_now()
-    if start_dt and end_dt:
-        if now_kst < start_dt:
-            states_value = "시작 전"
-        elif start_dt <= now_kst < end_dt:
-            states_value = "진행 중"
-        else:
-            states_value = "완료"
-    else:
-        states_value = "시작 전"
+    states_value = gcal_status_for_bounds(start_dt, end_dt)
 
     if start.get("dateTime") and start_dt:
         date_start_value = start_dt.isoformat()
@@ -465,25 +1917,46 @@ def notion_props_for_gcal_event(ev):
     props = {
         TITLE_PROP: {"title": [{"text": {"content": title}}]},
         CATEGORY_PROP: {"multi_select": [{"name": "SCHED"}]},
-        PRIORITY_PROP: {"select": {"name": "-"}},
         DATE_PROP: {"date": {"start": date_start_value, "end": date_end_value}},
         GCAL_EVENT_ID_PROP: {"rich_text": [{"text": {"content": ev["id"]}}]},
-        STATUS_PROP: {"status": {"name": states_value}},
     }
+    if PRIORITY_PROP in prop_types:
+        props[PRIORITY_PROP] = {"select": {"name": "-"}}
+    props.update(status_prop_payload(prop_types, states_value))
     return props
 
-def find_pages_by_gcal_event_id(eid: str):
-    return query_notion_database({
-        "property": GCAL_EVENT_ID_PROP,
-        "rich_text": {"equals": eid}
-    })
-
-def dedupe_pages_keep_oldest(pages):
+def find_pages_by_gcal_event_ids(eids, database_id=None):
+    """
+    여러 gcal_event_id를 OR 필터 한 번(GCAL_LOOKUP_BATCH개씩, 배치끼리 병렬)으로 조회 -> {eid: [pages]}
     """
-    같은 gcal_event_id가 여러 개면 가장 오래된 것 1개만 남기고 나머지는 아카이브
+    eids = list(dict.fromkeys(eids))
+    chunks = [eids[i:i + GCAL_LOOKUP_BATCH] for i in range(0, len(eids), GCAL_LOOKUP_BATCH)]
+
+    def _lookup(chunk):
+        return query_notion_database({
+            "or": [
+                {"property": GCAL_EVENT_ID_PROP, "rich_text": {"equals": eid}}
+                for eid in chunk
+            ]
+        }, database_id, CACHED_PROPS)
+
+    found = {}
+    wanted = set(eids)
+    for _chunk, pages, err in run_concurrently(_lookup, chunks):
+        if err is not None:
+            raise err
+        for p in pages:
+            eid = safe_get_rich_text(p, GCAL_EVENT_ID_PROP)
+            if eid in wanted:
+                found.setdefault(eid, []).append(p)
+    return found
+
+def split_pages_keep_oldest(pages):
+    """
+    (가장 오래된 페이지, 나머지 중복 페이지 목록)
     """
     if not pages:
-        return None
+        return None, []
 
     def created_time(p):
         s = p.get("created_time")
@@ -493,111 +1966,326 @@ def dedupe_pages_keep_oldest(pages):
             return datetime.max
 
     pages_sorted = sorted(pages, key=created_time)
-    keep = pages_sorted[0]
+    return pages_sorted[0], pages_sorted[1:]
 
-    for p in pages_sorted[1:]:
-        try:
-            archive_notion_page(p["id"])
-        except Exception:
-            pass
+def _normalize_date_value(raw):
+    """
+    date만 있으면 'YYYY-MM-DD', datetime이면 KST isoformat으로 맞춤
+    (Notion은 '...T14:00:00.000+09:00'처럼 돌려주므로 문자열 그대로 비교하면 안 됨)
+    """
+    if not raw:
+        return None
+    if len(raw) <= 10:
+        return raw
+    dt = parse_iso_to_kst_dt(raw)
+    return dt.isoformat() if dt else raw
 
-    return keep
+def _prop_value_for_compare(prop: dict):
+    """
+    쓰기용 property payload -> 비교용 값
+    """
+    if "title" in prop:
+        return "".join(x["text"]["content"] for x in prop["title"]) or None
+    if "rich_text" in prop:
+        return "".join(x["text"]["content"] for x in prop["rich_text"]) or None
+    if "multi_select" in prop:
+        return sorted(x["name"] for x in prop["multi_select"])
+    if "status" in prop:
+        return prop["status"]["name"] if prop["status"] else None
+    if "select" in prop:
+        return prop["select"]["name"] if prop["select"] else None
+    if "date" in prop:
+        d = prop["date"] or {}
+        return (_normalize_date_value(d.get("start")), _normalize_date_value(d.get("end")))
+    return prop
+
+def page_value_for_compare(page, prop_name):
+    """
+    기존 페이지 property -> 비교용 값(safe_get_* 기준)
+    """
+    if prop_name == TITLE_PROP:
+        return safe_get_title(page)
+    if prop_name == STATUS_PROP:
+        return safe_get_status_name(page)
+    if prop_name == CATEGORY_PROP:
+        return sorted(safe_get_multi_select_names(page, prop_name))
+    if prop_name == PRIORITY_PROP:
+        return safe_get_select_name(page, prop_name)
+    if prop_name == DATE_PROP:
+        start_raw, end_raw = safe_get_date_raw(page)
+        return (_normalize_date_value(start_raw), _normalize_date_value(end_raw))
+    if prop_name == GCAL_EVENT_ID_PROP:
+        return safe_get_rich_text(page, prop_name)
+    return None
 
-def upsert_calendar_page_by_event(ev, by_event_id):
+def diff_notion_props(page, props: dict) -> dict:
     """
-    by_event_id에 있으면 업데이트
-    없으면 전수검색(보험) -> 있으면 dedupe 후 업데이트
-    없으면 생성
+    props 중 page와 값이 다른 것만 반환(전부 같으면 빈 dict)
+    """
+    changed = {}
+    for name, prop in props.items():
+        if page_value_for_compare(page, name) != _prop_value_for_compare(prop):
+            changed[name] = prop
+    return changed
+
+def resolve_pages_for_events(eids, by_event_id, page_index, cached_pages, database_id=None):
+    """
+    by_event_id에 없는 일정의 페이지를 찾아 by_event_id에 채움
+    1) 저장된 인덱스(eid -> page_id) + 캐시로 바로 찾기
+    2) 나머지는 OR 필터 배치 조회(보험) -> 중복이면 가장 오래된 것만
+    반환: 아카이브할 중복 페이지 목록
+    """
+    cache_by_id = {p["id"]: p for p in cached_pages}
+    unresolved = []
+    for eid in eids:
+        if eid in by_event_id:
+            continue
+        page = cache_by_id.get(page_index.get(eid))
+        if page and safe_get_rich_text(page, GCAL_EVENT_ID_PROP) == eid:
+            by_event_id[eid] = page
+        else:
+            unresolved.append(eid)
+
+    duplicates = []
+    for eid, pages in find_pages_by_gcal_event_ids(unresolved, database_id).items():
+        keep, dups = split_pages_keep_oldest(pages)
+        if keep:
+            by_event_id[eid] = keep
+        duplicates.extend(dups)
+    return duplicates
+
+def calendar_page_write(ev, by_event_id, prop_types: dict):
+    """
+    일정 1개에 필요한 노션 쓰기(notion_write)
+    - by_event_id에 있으면 바뀐 속성만 update(바뀐 게 없으면 None)
+    - 없으면 create (by_event_id는 resolve_pages_for_events로 미리 채워둘 것)
     """
     eid = ev["id"]
-    props = notion_props_for_gcal_event(ev)
+    props = notion_props_for_gcal_event(ev, prop_types)
 
     keep_page = by_event_id.get(eid)
-    if not keep_page:
-        pages_same = find_pages_by_gcal_event_id(eid)
-        keep_page = dedupe_pages_keep_oldest(pages_same)
-
     if keep_page:
-        page_id = keep_page["id"]
-        try:
-            update_notion_page(page_id, props)
-        except requests.HTTPError:
-            props2 = dict(props)
-            props2[STATUS_PROP] = {"select": {"name": props[STATUS_PROP]["status"]["name"]}}
-            update_notion_page(page_id, props2)
-        return "updated"
+        changed = diff_notion_props(keep_page, props)
+        if not changed:
+            return None
+        return notion_write("update", keep_page["id"], eid, changed)
 
-    try:
-        create_notion_page(props)
-    except requests.HTTPError:
-        props2 = dict(props)
-        props2[STATUS_PROP] = {"select": {"name": props[STATUS_PROP]["status"]["name"]}}
-        create_notion_page(props2)
-    return "created"
+    return notion_write("create", None, eid, props)
 
-def sync_gcal_to_notion(base_date_obj):
+def stale_calendar_writes(pending, valid_events, removed_ids, by_event_id, prop_types: dict, incremental: bool):
     """
-    ✅ 어제/오늘/내일 범위를 동기화
-    - 취소/불참 제외
-    - 일정 제목/시간/날짜 변경 반영(업서트)
-    - 윈도우 안에서 사라진 일정은 아카이브
+    이전 실행에서 큐에 남은 일정 쓰기 중 지금 캘린더와 안 맞는 것 -> [(write, props 또는 None(삭제))]
+    - 취소/불참/윈도우 밖이 된 일정(전체 동기화면 목록에 없는 일정)의 create, 취소된 일정의 update
+    - 페이지가 이미 있는 일정의 create(이번 diff가 update로 대신함)
+    - 아직 있는 일정의 update는 지금 일정 값과 페이지가 다른 속성만 남김(되돌아갔으면 삭제)
+    """
+    revisions = []
+    for write in pending:
+        eid = write["event_id"]
+        if not eid:
+            continue
+        if eid in removed_ids or (write["op"] == "create" and not incremental and eid not in valid_events):
+            revisions.append((write, None))
+            continue
+        if write["op"] == "create":
+            if eid in by_event_id:
+                revisions.append((write, None))
+            continue
+        ev, page = valid_events.get(eid), by_event_id.get(eid)
+        if ev is None or page is None or page["id"] != write["page_id"]:
+            continue
+        desired = notion_props_for_gcal_event(ev, prop_types)
+        props = {
+            name: desired.get(name, prop) for name, prop in write["props"].items()
+            if name not in desired or diff_notion_props(page, {name: desired[name]})
+        }
+        if props != write["props"]:
+            revisions.append((write, props or None))
+    return revisions
+
+def sync_window(base_date_obj):
+    """
+    (window_start, window_end, window_end_plus1)
+    """
+    window_start = base_date_obj + timedelta(days=min(WINDOW_DAYS))
+    window_end = base_date_obj + timedelta(days=max(WINDOW_DAYS))
+    window_end_plus1 = base_date_obj + timedelta(days=max(WINDOW_DAYS) + 1)
+    return window_start, window_end, window_end_plus1
+
+def fetch_gcal_changes(base_date_obj, state: dict, calendar_id=None):
+    """
+    캘린더 쪽 조회만 -> (events, nextSyncToken, incremental 여부)
+    - state에 syncToken이 있고 윈도우가 같으면 바뀐 일정만 가져옴(incremental)
+      토큰 만료(410) / 날짜 롤오버 시에는 전체 재동기화(full)
     """
-    calendar_id = os.getenv("GCAL_ID")
+    from googleapiclient.errors import HttpError
+
+    # 환경변수 GCAL_ID는 calendar_id를 안 줬을 때만(빈 값은 다른 캘린더로 바꾸지 않고 실패)
+    if calendar_id is None:
+        calendar_id = os.getenv("GCAL_ID")
     if not calendar_id:
         raise ValueError("GCAL_ID가 비어있습니다.")
 
     service = build_gcal_service()
+    window_start, _window_end, window_end_plus1 = sync_window(base_date_obj)
 
-    window_dates = [base_date_obj + timedelta(days=d) for d in WINDOW_DAYS]
-    events_all = []
-    for d in window_dates:
-        events_all.extend(fetch_gcal_events_for_date(service, calendar_id, d))
+    sync_token = state.get("gcal_sync_token")
+    incremental = bool(sync_token) and state.get("gcal_sync_window") == window_start.strftime("%Y-%m-%d")
 
-    window_start = base_date_obj + timedelta(days=min(WINDOW_DAYS))
-    window_end = base_date_obj + timedelta(days=max(WINDOW_DAYS))
-    window_end_plus1 = base_date_obj + timedelta(days=max(WINDOW_DAYS) + 1)
+    if incremental:
+        try:
+            events_all, next_token = fetch_gcal_events_incremental(service, calendar_id, sync_token)
+            return events_all, next_token, True
+        except HttpError as e:
+            if not is_gcal_sync_token_expired(e):
+                raise
+            print("ℹ️ Calendar sync token expired, running full resync")
+
+    events_all, next_token = fetch_gcal_events_for_window(
+        service, calendar_id, window_start, window_end_plus1
+    )
+    return events_all, next_token, False
+
+def sync_gcal_to_notion(base_date_obj, state: dict, calendar_id=None, database_id=None):
+    """
+    ✅ 어제/오늘/내일 범위를 동기화(순차 버전)
+    캘린더 조회와 노션 캐시 갱신을 겹치려면 sync_gcal_to_notion_async
+    """
+    prop_types = load_notion_schema(state, database_id, check=True)
+    changes = timed("gcal_fetch", fetch_gcal_changes, base_date_obj, state, calendar_id)
+    cached_pages = timed("candidate_query", refresh_notion_cache, state, base_date_obj, database_id)
+    return apply_gcal_changes(base_date_obj, state, changes, cached_pages, prop_types, database_id)
 
+async def sync_gcal_to_notion_async(base_date_obj, state: dict, calendar_id=None, database_id=None, changes=None):
+    """
+    캘린더 조회와 노션 캐시 갱신(서로 독립)을 동시에 돌린 뒤 쓰기 단계 실행
+    (스키마는 캐시가 있으면 I/O 없음 — 속성이 빠졌으면 조회 전에 바로 실패)
+    - changes: probe에서 이미 받은 캘린더 변경분이 있으면 다시 조회하지 않음
+    """
+    prop_types = await asyncio.to_thread(load_notion_schema, state, database_id, True)
+    if changes is None:
+        changes, cached_pages = await asyncio.gather(
+            asyncio.to_thread(timed, "gcal_fetch", fetch_gcal_changes, base_date_obj, state, calendar_id),
+            asyncio.to_thread(timed, "candidate_query", refresh_notion_cache, state, base_date_obj, database_id),
+        )
+    else:
+        cached_pages = await asyncio.to_thread(
+            timed, "candidate_query", refresh_notion_cache, state, base_date_obj, database_id
+        )
+    return await asyncio.to_thread(
+        apply_gcal_changes, base_date_obj, state, changes, cached_pages, prop_types, database_id
+    )
+
+def apply_gcal_changes(base_date_obj, state: dict, changes, cached_pages, prop_types: dict, database_id=None):
+    """
+    ✅ 캘린더 변경분을 노션에 반영
+    - 취소/불참 제외
+    - 일정 제목/시간/날짜 변경 반영(업서트)
+    - 윈도우 안에서 사라진 일정은 아카이브
+    """
+    events_all, next_token, incremental = changes
+    database_id = database_id or get_database_id()
+    window_start, window_end, window_end_plus1 = sync_window(base_date_obj)
     window_start_str = window_start.strftime("%Y-%m-%d")
-    window_end_plus1_str = window_end_plus1.strftime("%Y-%m-%d")
 
-    candidates = query_notion_database({
-        "and": [
-            {"property": CATEGORY_PROP, "multi_select": {"contains": "SCHED"}},
-            {"property": GCAL_EVENT_ID_PROP, "rich_text": {"is_not_empty": True}},
-            {"property": DATE_PROP, "date": {"is_not_empty": True}},
-            {"property": DATE_PROP, "date": {"on_or_after": window_start_str}},
-            {"property": DATE_PROP, "date": {"on_or_before": window_end_plus1_str}},
-        ]
-    })
+    with phase_timer("dedupe"):
+        candidates = []
+        for p in cached_pages:
+            start_d, _end_d = safe_get_date_range(p)
+            if not start_d or not (window_start <= start_d <= window_end_plus1):
+                continue
+            if not is_sched_page(p):
+                continue
+            candidates.append(p)
+
+        grouped = {}
+        for p in candidates:
+            eid = safe_get_rich_text(p, GCAL_EVENT_ID_PROP)
+            if eid:
+                grouped.setdefault(eid, []).append(p)
+
+        by_event_id = {}
+        duplicates = []
+        for eid, pages in grouped.items():
+            keep, dups = split_pages_keep_oldest(pages)
+            if keep:
+                by_event_id[eid] = keep
+            duplicates.extend(dups)
+
+        # 같은 id가 여러 번 오면(증분 결과 등) 마지막 것만
+        latest_events = {}
+        for ev in events_all:
+            if "id" in ev:
+                latest_events[ev["id"]] = ev
+
+        valid_events = {}
+        removed_ids = set()
+        for eid, ev in latest_events.items():
+            if (
+                (ev.get("status") or "").lower() == "cancelled"
+                or is_declined_for_me(ev)
+                or (incremental and not gcal_event_in_window(ev, window_start, window_end_plus1))
+            ):
+                removed_ids.add(eid)
+                continue
+            valid_events[eid] = ev
 
-    grouped = {}
-    for p in candidates:
-        eid = safe_get_rich_text(p, GCAL_EVENT_ID_PROP)
-        if eid:
-            grouped.setdefault(eid, []).append(p)
+        page_index = dict(state.get("gcal_page_index") or {})
+        duplicates.extend(resolve_pages_for_events(valid_events, by_event_id, page_index, cached_pages, database_id))
 
-    by_event_id = {}
-    for eid, pages in grouped.items():
-        keep = dedupe_pages_keep_oldest(pages)
-        if keep:
-            by_event_id[eid] = keep
+    # 윈도우 일정의 시작/끝 + 다음 states 전환 힙(바뀌지 않은 일정은 전환 시각이 됐을 때만 갱신)
+    now_kst = kst_now()
+    known_bounds = dict(state.get("gcal_events") or {}) if incremental else {}
+    transitions = [list(e) for e in state.get("gcal_transitions") or []] if incremental else []
+    heapq.heapify(transitions)
+    if incremental and "gcal_transitions" not in state:
+        for eid, (start_iso, end_iso) in known_bounds.items():
+            schedule_status_transition(
+                transitions, eid, parse_iso_to_kst_dt(start_iso), parse_iso_to_kst_dt(end_iso), now_kst
+            )
+    for eid in removed_ids:
+        known_bounds.pop(eid, None)
+    for eid, ev in valid_events.items():
+        start_dt, end_dt = gcal_event_bounds(ev)
+        if start_dt and end_dt:
+            known_bounds[eid] = [start_dt.isoformat(), end_dt.isoformat()]
+            schedule_status_transition(transitions, eid, start_dt, end_dt, now_kst)
+    due_transitions = pop_due_transitions(transitions, known_bounds, now_kst) - set(valid_events)
+
+    summary = {
+        "mode": "incremental" if incremental else "full",
+        "created": 0, "updated": 0, "skipped": 0, "archived": 0, "deduped": 0, "errors": [],
+    }
 
-    valid_event_ids = set()
+    # 이전 실행에서 실패해 남은 쓰기 중 지금 일정과 안 맞는 건 보내기 전에 정리
+    revise_notion_writes(database_id, stale_calendar_writes(
+        pending_notion_writes(database_id, ("create", "update")),
+        valid_events, removed_ids, by_event_id, prop_types, incremental,
+    ))
+
+    # 쓰기는 전부 큐에 먼저 기록한 뒤 보냄(이전 실행에서 실패한 쓰기도 같이 재시도)
+    writes = []
+    for ev in valid_events.values():
+        write = calendar_page_write(ev, by_event_id, prop_types)
+        if write is None:
+            summary["skipped"] += 1
+        else:
+            writes.append(write)
 
-    for ev in events_all:
-        if "id" not in ev:
-            continue
-        if (ev.get("status") or "").lower() == "cancelled":
+    for eid in due_transitions:
+        page = by_event_id.get(eid)
+        if not page:
             continue
-        if is_declined_for_me(ev):
-            continue
-
-        eid = ev["id"]
-        valid_event_ids.add(eid)
-        upsert_calendar_page_by_event(ev, by_event_id)
+        start_iso, end_iso = known_bounds[eid]
+        desired = gcal_status_for_bounds(parse_iso_to_kst_dt(start_iso), parse_iso_to_kst_dt(end_iso), now_kst)
+        if safe_get_status_name(page) != desired:
+            writes.append(notion_write("update", page["id"], eid, status_prop_payload(prop_types, desired)))
 
+    stale_pages = []
     for eid, page in by_event_id.items():
-        if eid in valid_event_ids:
+        if incremental and eid not in removed_ids:
+            continue
+        if eid in valid_events:
             continue
 
         start_d, end_d = safe_get_date_range(page)
@@ -605,38 +2293,189 @@ def sync_gcal_to_notion(base_date_obj):
             continue
 
         if date_ranges_overlap(start_d, end_d, window_start, window_end):
-            try:
-                archive_notion_page(page["id"])
-            except Exception:
-                pass
+            stale_pages.append(page)
+
+    duplicate_ids = {page["id"] for page in duplicates}
+    for page in duplicates + stale_pages:
+        writes.append(notion_write("archive", page["id"], safe_get_rich_text(page, GCAL_EVENT_ID_PROP)))
+
+    enqueue_notion_writes(database_id, writes)
+    with phase_timer("upserts"):
+        sent = drain_notion_outbox(database_id, ("create", "update"))
+    with phase_timer("archive"):
+        sent += drain_notion_outbox(database_id, ("archive",))
+
+    written_pages = {}
+    archived_ids = set()  # 이번 호출에서 아카이브한 페이지(다른 source의 아카이브와 섞이지 않게)
+    for write, page, err in sent:
+        if err is not None:
+            summary["errors"].append((write["event_id"] or write["page_id"], err))
+            continue
+        if write["op"] == "archive":
+            # 중복 페이지 정리는 deduped, 캘린더에서 빠진 일정은 archived
+            summary["deduped" if write["page_id"] in duplicate_ids else "archived"] += 1
+            archived_ids.add(write["page_id"])
+            continue
+        summary["created" if write["op"] == "create" else "updated"] += 1
+        written_pages[page["id"]] = page
+        if write["event_id"]:
+            page_index[write["event_id"]] = page["id"]
+
+    # 인덱스는 캐시에 있거나 방금 쓴 페이지만 유지(아카이브된 페이지는 자동으로 빠짐)
+    live_ids = {p["id"] for p in cached_pages} | set(written_pages)
+    live_ids -= archived_ids
+    for eid, page in by_event_id.items():
+        page_index.setdefault(eid, page["id"])
+    state["gcal_page_index"] = {
+        eid: page_id for eid, page_id in page_index.items() if page_id in live_ids
+    }
+
+    # 렌더 단계용: window의 SCHED 페이지(이번 동기화에서 쓴 결과 반영)
+    # 쓴 페이지는 캐시에도 바로 반영(write-through)
+    snapshot = {}
+    for p in cached_pages:
+        start_d, end_d = safe_get_date_range(p)
+        if is_sched_page(p) and date_ranges_overlap(start_d, end_d, window_start, window_end):
+            snapshot[p["id"]] = p
+    cache_pages = state["notion_cache"]["pages"]
+    floor = notion_cache_floor(base_date_obj)
+    for page_id, page in written_pages.items():
+        snapshot[page_id] = page
+        if _cache_keeps(page, floor):
+            cache_pages[page_id] = compact_page(page)
+    # 아카이브된 페이지는 last_edited_time delta로 안 보이므로 여기서 캐시에서 직접 뺌
+    for page_id in archived_ids:
+        snapshot.pop(page_id, None)
+        cache_pages.pop(page_id, None)
+    summary["snapshot"] = list(snapshot.values())
+
+    # 실패가 있으면 토큰을 넘기지 않음 -> 다음 실행에서 같은 변경분을 다시 받음
+    # (DB 속성이 바뀌었을 수도 있으므로 스키마도 다시 읽게 함)
+    if summary["errors"]:
+        state.pop("notion_schema", None)
+    else:
+        if next_token:
+            state["gcal_sync_token"] = next_token
+        else:
+            state.pop("gcal_sync_token", None)
+        state["gcal_sync_window"] = window_start_str
+        state["gcal_events"] = known_bounds
+        state["gcal_transitions"] = transitions
+
+    return summary
+
+def apply_due_status_transitions(state: dict, database_id=None) -> dict:
+    """
+    캘린더 동기화 주기가 아닐 때: 전환 시각이 된 일정의 states만 갱신(캘린더 조회 없음)
+    - 대상 페이지는 gcal_page_index로 찾고, 캐시의 states가 이미 맞으면 건너뜀
+    - 결과 {"updated": n, "errors": [(eid, err)]}
+    """
+    summary = {"updated": 0, "errors": []}
+    transitions = [list(e) for e in state.get("gcal_transitions") or []]
+    if not transitions:
+        return summary
+    heapq.heapify(transitions)
+    now_kst = kst_now()
+    known_bounds = state.get("gcal_events") or {}
+    due = pop_due_transitions(transitions, known_bounds, now_kst)
+    if not due:
+        state["gcal_transitions"] = transitions
+        return summary
+
+    database_id = database_id or get_database_id()
+    prop_types = load_notion_schema(state, database_id, check=True)
+    page_index = state.get("gcal_page_index") or {}
+    cache = state.get("notion_cache") or {}
+    cache_pages = cache.get("pages") or {}
+
+    writes = []
+    for eid in due:
+        page_id = page_index.get(eid)
+        if not page_id:
+            continue
+        start_iso, end_iso = known_bounds[eid]
+        desired = gcal_status_for_bounds(parse_iso_to_kst_dt(start_iso), parse_iso_to_kst_dt(end_iso), now_kst)
+        cached_page = cache_pages.get(page_id)
+        if cached_page and safe_get_status_name(cached_page) == desired:
+            continue
+        writes.append(notion_write("update", page_id, eid, status_prop_payload(prop_types, desired)))
+
+    # 생성은 page_index 갱신이 필요하므로 다음 동기화에 맡기고 수정만 보냄
+    enqueue_notion_writes(database_id, writes)
+    with phase_timer("upserts"):
+        sent = drain_notion_outbox(database_id, ("update",))
+    for write, page, err in sent:
+        if err is not None:
+            summary["errors"].append((write["event_id"] or write["page_id"], err))
+            continue
+        summary["updated"] += 1
+        if cache and page["id"] in cache_pages:
+            cache_pages[page["id"]] = compact_page(page)
+
+    # 실패하면 힙을 그대로 둬서 다음 실행에서 다시 꺼내게 함
+    if not summary["errors"]:
+        state["gcal_transitions"] = transitions
+    return summary
 
 
 # ==============================
 # ✅ Notion fetch (OPTIMIZED)
 # ==============================
-def fetch_notion_data_for_window(base_date_obj):
+def notion_window_filter(window_start, window_end):
+    """
+    window와 겹칠 수 있는 페이지만 서버에서 거르는 필터
+    - Notion date 필터는 범위의 start 기준으로 비교됨
+    - start가 window 안(앞뒤 하루 여유: datetime은 UTC로 비교됨)인 페이지
+      + window 전 NOTION_RANGE_LOOKBACK_DAYS 안에 시작한 장기 일정 후보
+      (캐시 없이 쓸 때만 이 범위로 제한됨 — 캐시는 full 때 그 이전에 시작한 기간 일정도 가져옴)
+    - end가 없는 페이지는 start == end 이므로 첫 조건으로 정확히 걸러짐
     """
-    날짜가 들어있는 페이지를 넉넉하게 가져온 뒤,
-    로컬에서 정확하게 window overlap 필터.
-    장기 일정의 마지막 날 누락 방지용.
+    lookback_start = window_start - timedelta(days=NOTION_RANGE_LOOKBACK_DAYS + 1)
+    window_end_plus1 = window_end + timedelta(days=1)
+    return {
+        "and": [
+            {"property": DATE_PROP, "date": {"on_or_after": lookback_start.strftime("%Y-%m-%d")}},
+            {"property": DATE_PROP, "date": {"on_or_before": window_end_plus1.strftime("%Y-%m-%d")}},
+        ]
+    }
+
+def fetch_notion_data_for_window(base_date_obj, state=None, sched_pages=None, database_id=None):
+    """
+    window와 겹칠 수 있는 페이지만 가져온 뒤,
+    로컬에서 정확하게 window overlap 필터(최종 확인용).
+    - state가 있으면 페이지 캐시(delta 갱신)에서, 없으면 서버 필터 쿼리로
+    - sched_pages(동기화 결과 스냅샷)가 있으면 SCHED는 그걸 쓰고 나머지만 가져옴
+      (방금 동기화에서 캐시를 갱신했으므로 캐시도 다시 갱신하지 않음)
     """
     window_start = base_date_obj + timedelta(days=min(WINDOW_DAYS))
     window_end = base_date_obj + timedelta(days=max(WINDOW_DAYS))
 
-    candidates = query_notion_database({
-        "property": DATE_PROP,
-        "date": {"is_not_empty": True},
-    })
-
-    filtered = []
-    for page in candidates:
-        start_d, end_d = safe_get_date_range(page)
-        if not start_d or not end_d:
-            continue
-        if date_ranges_overlap(start_d, end_d, window_start, window_end):
-            filtered.append(page)
-
-    return {"results": filtered}
+    if sched_pages is None:
+        if state is not None:
+            candidates = refresh_notion_cache(state, base_date_obj, database_id)
+        else:
+            candidates = iter_notion_database(
+                notion_window_filter(window_start, window_end), database_id, CACHED_PROPS
+            )
+    else:
+        if state is not None and state.get("notion_cache"):
+            others = list(state["notion_cache"]["pages"].values())
+        else:
+            window_filter = notion_window_filter(window_start, window_end)
+            window_filter["and"].append(
+                {"property": CATEGORY_PROP, "multi_select": {"does_not_contain": "SCHED"}}
+            )
+            others = iter_notion_database(window_filter, database_id, CACHED_PROPS)
+        candidates = itertools.chain((p for p in others if not is_sched_page(p)), sched_pages)
+
+    # 페이지 JSON은 배치가 오는 대로 여기서 TaskRecord로 바꾸고 버림
+    # 캐시 전체에 대한 질의는 이 한 번뿐이라 선형으로 거르고,
+    # 인덱스는 window 안의 task로만 만들어 날짜별 조회(group_tasks_for_date)에서 씀
+    results = [
+        task for task in map(decode_task, candidates)
+        if task is not None and date_ranges_overlap(task.start_date, task.end_date, window_start, window_end)
+    ]
+    return {"results": results, "index": TaskIntervalIndex(results)}
 
 
 # ==============================
@@ -657,59 +2496,33 @@ def format_task_line(title, status):
     return line
 
 def group_tasks_for_date(data, target_date):
+    """
+    data["results"]: TaskRecord 목록 -> {카테고리: [(priority, status, title)]}
+    data["index"]가 있으면 그걸로 target_date에 걸친 task만 바로 찾음
+    (없으면 선형 — 한 번 쓰고 버릴 인덱스를 만드는 것보다 빠름)
+    """
     grouped = {cat: [] for cat, _ in CATEGORY_ORDER}
-    display_categories = {cat for cat, _ in CATEGORY_ORDER}
-
-    for page in data.get("results", []):
-        start_d, end_d = safe_get_date_range(page)
-        if not start_d or not end_d:
-            continue
-        if not (start_d <= target_date <= end_d):
-            continue
-
-        title = safe_get_title(page)
-        if not title:
-            continue
-
-        status = safe_get_status_name(page)
-        categories = safe_get_multi_select_names(page, CATEGORY_PROP)
-        priority = safe_get_select_name(page, PRIORITY_PROP)
-
-        normalized_categories = []
-        for category in categories:
-            normalized = (category or "").strip().upper()
-            if not normalized:
-                continue
-            if normalized in HIDDEN_LABELS:
-                continue
-            if normalized in display_categories:
-                normalized_categories.append(normalized)
 
-        # ETC를 직접 선택한 경우에만 ETC로 표시
-        # 숨김 라벨 / 알 수 없는 라벨만 있으면 표시 안 함
-        if not normalized_categories:
+    index = data.get("index")
+    if index is not None:
+        active = index.active_on(target_date)
+    else:
+        active = (t for t in data.get("results", []) if t.start_date <= target_date <= t.end_date)
+    for task in active:
+        if not task.categories:
             continue
-
-        normalized_categories = list(dict.fromkeys(normalized_categories))
-
-        for category in normalized_categories:
-            grouped[category].append((priority, status, title, page))
+        for category in task.categories:
+            grouped[category].append(task)
 
     for cat in grouped:
-        grouped[cat].sort(key=lambda x: priority_rank(x[0]))
+        grouped[cat].sort(key=lambda t: t.priority_rank)
 
     if "SCHED" in grouped:
-        def cal_key(item):
-            _priority, _status, _title, _page = item
-            dt = safe_get_date_start_dt_kst(_page)
-            if not dt:
-                return datetime(2100, 1, 1, tzinfo=KST)
-            return dt
-        grouped["SCHED"].sort(key=cal_key)
+        grouped["SCHED"].sort(key=lambda t: t.start_dt)
 
     cleaned = {}
     for cat, items in grouped.items():
-        cleaned[cat] = [(p, s, t) for (p, s, t, _page) in items]
+        cleaned[cat] = [(t.priority, t.status, t.title) for t in items]
     return cleaned
 
 def create_discord_payload(data, eff_str):
@@ -742,59 +2555,564 @@ def create_discord_payload(data, eff_str):
 # ==============================
 # ✅ Discord webhook
 # ==============================
+def payload_hash(payload) -> str:
+    """
+    임베드 내용이 같으면 항상 같은 값(키 순서 무관)
+    """
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
 def clean_webhook_url(url: str) -> str:
     return url.split("?")[0].strip()
 
 def send_new_message(webhook_url, payload):
     base = clean_webhook_url(webhook_url)
-    r = requests.post(base, params={"wait": "true"}, json=payload)
+    r = http_request(
+        "discord", "POST", base, endpoint="discord.webhook.execute", params={"wait": "true"}, json=payload
+    )
     r.raise_for_status()
     return r.json()["id"]
 
 def edit_message(webhook_url, message_id, payload):
     base = clean_webhook_url(webhook_url)
     url = f"{base}/messages/{message_id}"
-    r = requests.patch(url, json=payload)
+    r = http_request("discord", "PATCH", url, endpoint="discord.webhook.edit", json=payload)
     r.raise_for_status()
     return True
 
 
 # ==============================
-# ✅ Main
+# ✅ Sources / destinations config
 # ==============================
-def main():
+def get_webhook_url():
     webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
     if not webhook_url:
         raise ValueError("DISCORD_WEBHOOK_URL이 비어있습니다.")
+    return webhook_url
 
-    now = kst_now()
-    state = load_state()
+def env_config():
+    """
+    기존 환경변수 1세트(NOTION_DATABASE_ID / GCAL_ID / DISCORD_WEBHOOK_URL) 설정
+    - state는 지금처럼 최상위(flat)에 저장
+    """
+    return {
+        "flat_state": True,
+        "sources": [{
+            "name": "default",
+            "notion_database_id": get_database_id(),
+            "gcal_id": os.getenv("GCAL_ID") or "",
+        }],
+        "destinations": [{
+            "name": "default",
+            "webhook_url": get_webhook_url(),
+            "sources": ["default"],
+            "labels": None,
+            "exclude_labels": set(),
+        }],
+    }
+
+def _config_value(entry: dict, key: str):
+    """
+    entry[key] 또는 entry[key + "_env"]가 가리키는 환경변수 값(비밀값은 _env 권장)
+    """
+    if entry.get(key):
+        return entry[key]
+    env_name = entry.get(f"{key}_env")
+    return os.getenv(env_name) if env_name else None
+
+def _label_set(values):
+    return {(v or "").strip().upper() for v in values or [] if (v or "").strip()}
+
+def load_bot_config(path: str):
+    """
+    여러 노션 DB / 캘린더(sources) -> 여러 디스코드 채널(destinations) 설정(JSON)
+
+    {
+      "sources": [
+        {"name": "team-a", "notion_database_id_env": "TEAM_A_DB", "gcal_id": "a@group.calendar.google.com"},
+        {"name": "team-b", "notion_database_id": "..."}
+      ],
+      "destinations": [
+        {"name": "a-all", "webhook_url_env": "TEAM_A_WEBHOOK", "sources": ["team-a"]},
+        {"name": "sched", "webhook_url_env": "SCHED_WEBHOOK", "labels": ["SCHED"]}
+      ]
+    }
+    - gcal_id가 없는 source는 캘린더 동기화를 하지 않음
+    - destination의 sources를 생략하면 전체, labels가 있으면 그 라벨이 붙은 할 일만
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+
+    sources = []
+    for entry in raw.get("sources") or []:
+        name = entry.get("name")
+        database_id = normalize_notion_db_id(_config_value(entry, "notion_database_id") or "")
+        if not name or not database_id:
+            raise ValueError(f"source 설정에 name / notion_database_id가 필요합니다: {entry}")
+        source = {"name": name, "notion_database_id": database_id}
+        if "gcal_id" in entry or "gcal_id_env" in entry:
+            # 비어 있으면 GCAL_ID(다른 캘린더)로 넘어가지 않게 여기서 실패
+            source["gcal_id"] = _config_value(entry, "gcal_id")
+            if not source["gcal_id"]:
+                raise ValueError(f"source '{name}'의 gcal_id / gcal_id_env 값이 비어있습니다.")
+        sources.append(source)
+
+    source_names = [s["name"] for s in sources]
+    if not sources or len(set(source_names)) != len(source_names):
+        raise ValueError("sources가 비어있거나 name이 중복됩니다.")
+
+    destinations = []
+    for entry in raw.get("destinations") or []:
+        name = entry.get("name")
+        webhook_url = _config_value(entry, "webhook_url")
+        if not name or not webhook_url:
+            raise ValueError(f"destination 설정에 name / webhook_url이 필요합니다: {entry.get('name')}")
+        dest_sources = entry.get("sources") or source_names
+        unknown = [s for s in dest_sources if s not in source_names]
+        if unknown:
+            raise ValueError(f"destination '{name}'에 없는 source가 있습니다: {unknown}")
+        destinations.append({
+            "name": name,
+            "webhook_url": webhook_url,
+            "sources": dest_sources,
+            "labels": _label_set(entry["labels"]) if entry.get("labels") else None,
+            "exclude_labels": _label_set(entry.get("exclude_labels")),
+        })
+
+    dest_names = [d["name"] for d in destinations]
+    if not destinations or len(set(dest_names)) != len(dest_names):
+        raise ValueError("destinations가 비어있거나 name이 중복됩니다.")
+
+    return {"flat_state": False, "sources": sources, "destinations": destinations}
+
+def source_state(state: dict, config: dict, name: str) -> dict:
+    if config.get("flat_state"):
+        return state
+    return state.setdefault("sources", {}).setdefault(name, {})
+
+def destination_state(state: dict, config: dict, name: str) -> dict:
+    if config.get("flat_state"):
+        return state
+    return state.setdefault("destinations", {}).setdefault(name, {})
+
+def route_tasks(destination: dict, data_by_source: dict):
+    """
+    destination이 구독하는 source들의 TaskRecord를 합치고 라벨 규칙으로 거름
+    """
+    include = destination["labels"]
+    exclude = destination["exclude_labels"]
+    routed = []
+    seen = set()
+    for name in destination["sources"]:
+        for task in data_by_source[name]["results"]:
+            if task.page_id in seen:
+                continue
+            if include is not None and not include.intersection(task.labels):
+                continue
+            if exclude and exclude.intersection(task.labels):
+                continue
+            seen.add(task.page_id)
+            routed.append(task)
+    return routed
 
-    base_date_obj = effective_date()
-    eff_str = base_date_obj.strftime("%Y-%m-%d")
 
-    # 1) 캘린더 -> 노션 동기화
-    if should_run_gcal_sync(state, now):
-        sync_gcal_to_notion(base_date_obj)
+# ==============================
+# ✅ Change probe (바뀐 게 없으면 무거운 단계 생략)
+# ==============================
+def probe_notion_watermark(database_id=None) -> dict:
+    """
+    가장 최근에 수정된 페이지 1개만 조회 -> {"last_edited_time", "id", "probed_at"} (빈 DB면 앞의 둘은 None)
+    """
+    probed_at = datetime.now(timezone.utc).isoformat()
+    page = next(iter_notion_database(
+        None, database_id, (TITLE_PROP,),
+        sorts=[{"timestamp": "last_edited_time", "direction": "descending"}],
+        page_size=1,
+    ), None)
+    if page is None:
+        return {"last_edited_time": None, "id": None, "probed_at": probed_at}
+    return {"last_edited_time": page.get("last_edited_time"), "id": page["id"], "probed_at": probed_at}
+
+def notion_changed_since(state: dict, mark: dict) -> bool:
+    """
+    저장된 watermark와 (수정 시각, 페이지)가 다르면 변경
+    - last_edited_time은 분 단위라 같은 페이지를 같은 분 안에 또 고치면 값이 같음
+      -> 지난 probe 때 그 분이 아직 안 끝났으면(시계 오차 1분 포함) 같아도 변경으로 봄
+    """
+    saved = state.get("notion_watermark") or {}
+    if (saved.get("last_edited_time"), saved.get("id")) != (mark.get("last_edited_time"), mark.get("id")):
+        return True
+    edited = parse_iso_to_kst_dt(mark.get("last_edited_time"))
+    probed_at = parse_iso_to_kst_dt(saved.get("probed_at"))
+    return bool(edited) and (not probed_at or edited + timedelta(minutes=2) > probed_at)
+
+def probe_gcal(base_date_obj, state: dict, calendar_id: str, now):
+    """
+    캘린더 변경 확인 -> (changes, needs_full)
+    - syncToken이 있고 윈도우가 같으면 바뀐 일정만 한 번 조회
+      바뀐 게 있으면 changes(그대로 apply_gcal_changes로), 없으면 토큰만 넘기고 동기화 완료로 기록
+    - 토큰이 없거나 만료 / 롤오버면 전체 동기화 필요(GCAL_SYNC_EVERY_MINUTES가 지났을 때만)
+    """
+    from googleapiclient.errors import HttpError
+
+    due = should_run_gcal_sync(state, now)
+    window_start, _window_end, _window_end_plus1 = sync_window(base_date_obj)
+    sync_token = state.get("gcal_sync_token")
+    if not sync_token or state.get("gcal_sync_window") != window_start.strftime("%Y-%m-%d"):
+        return None, due
+
+    try:
+        events, next_token = fetch_gcal_events_incremental(build_gcal_service(), calendar_id, sync_token)
+    except HttpError as e:
+        if not is_gcal_sync_token_expired(e):
+            raise
+        return None, due
+
+    if events:
+        return (events, next_token, True), False
+    if next_token:
+        state["gcal_sync_token"] = next_token
+    if due:
         mark_gcal_synced(state, now)
-        save_state(state)
+    return None, False
+
+async def probe_source(source: dict, src_state: dict, base_date_obj, now, tag="") -> dict:
+    """
+    source 1개의 변경 여부(노션 1쿼리 + 캘린더 1호출을 동시에, 상태 확인은 I/O 없음)
+    - 노션 캐시 전체 재조회 차례면(직접 삭제한 페이지는 그때만 빠짐) 바뀐 것으로 봄
+    - probe가 실패하면 전부 바뀐 것으로 보고 평소처럼 실행
+    """
+    probe = {
+        "watermark": None, "notion": True, "gcal_changes": None, "gcal_full": False, "transitions": False,
+        "cache_full": notion_cache_due(
+            src_state.get("notion_cache") or {}, notion_cache_floor(base_date_obj), datetime.now(timezone.utc)
+        ),
+    }
+    has_gcal = source.get("gcal_id") is not None
+    jobs = [asyncio.to_thread(probe_notion_watermark, source["notion_database_id"])]
+    if has_gcal:
+        jobs.append(asyncio.to_thread(probe_gcal, base_date_obj, src_state, source["gcal_id"], now))
+    try:
+        results = await asyncio.gather(*jobs)
+    except Exception as e:
+        print(f"⚠️ {tag}Change probe failed, running full cycle: {e!r}")
+        probe["gcal_full"] = has_gcal and should_run_gcal_sync(src_state, now)
+        return probe
+
+    watermark = results[0]
+    gcal_changes, gcal_full = results[1] if has_gcal else (None, False)
+    transition_at = next_status_transition_at(src_state) if has_gcal else None
+    probe.update({
+        "watermark": watermark,
+        "notion": notion_changed_since(src_state, watermark),
+        "gcal_changes": gcal_changes,
+        "gcal_full": gcal_full,
+        "transitions": bool(transition_at and transition_at <= now),
+    })
+    return probe
 
-    # 2) 노션 -> 디스코드
-    notion_data = fetch_notion_data_for_window(base_date_obj)
-    payload = create_discord_payload(notion_data, eff_str)
+def source_changed(probe: dict) -> bool:
+    return bool(
+        probe["notion"] or probe["gcal_changes"] or probe["gcal_full"] or probe["transitions"] or probe["cache_full"]
+    )
 
-    saved_date = state.get("date")
-    saved_message_id = state.get("message_id")
+
+# ==============================
+# ✅ Main
+# ==============================
+async def collect_source(source: dict, src_state: dict, base_date_obj, now, probe: dict, tag=""):
+    """
+    source 1개: (probe에서 캘린더 변경이 보였거나 전체 동기화 차례면) 캘린더 -> 노션 동기화 후 window 데이터
+    """
+    sched_pages = None
+    watermark = probe["watermark"]
+    wrote = 0
+    if source.get("gcal_id") is not None and (probe["gcal_changes"] or probe["gcal_full"]):
+        summary = await sync_gcal_to_notion_async(
+            base_date_obj, src_state, source["gcal_id"], source["notion_database_id"], probe["gcal_changes"]
+        )
+        sched_pages = summary["snapshot"]
+        wrote = summary["created"] + summary["updated"] + summary["archived"] + summary["deduped"]
+        count_outcomes(
+            "pages",
+            created=summary["created"], updated=summary["updated"],
+            skipped=summary["skipped"], archived=summary["archived"], deduped=summary["deduped"],
+            errors=len(summary["errors"]),
+        )
+        print(
+            f"📅 {tag}Calendar sync ({summary['mode']}): created={summary['created']} updated={summary['updated']} "
+            f"skipped={summary['skipped']} archived={summary['archived']} deduped={summary['deduped']} "
+            f"errors={len(summary['errors'])}"
+        )
+        for eid, err in summary["errors"]:
+            print(f"⚠️ {tag}Sync failed for {eid}: {err}")
+        # 실패가 있으면 다음 실행에서 다시 동기화
+        if not summary["errors"]:
+            mark_gcal_synced(src_state, now)
+    elif source.get("gcal_id") is not None:
+        # 동기화 사이에는 전환 시각이 된 일정의 states만
+        summary = await asyncio.to_thread(
+            apply_due_status_transitions, src_state, source["notion_database_id"]
+        )
+        wrote = summary["updated"]
+        if summary["updated"] or summary["errors"]:
+            count_outcomes("pages", updated=summary["updated"], errors=len(summary["errors"]))
+            print(f"⏰ {tag}Status transitions: updated={summary['updated']} errors={len(summary['errors'])}")
+        for eid, err in summary["errors"]:
+            print(f"⚠️ {tag}Status update failed for {eid}: {err}")
+    # 방금 쓴 페이지 때문에 다음 probe가 변경으로 보지 않도록 window 조회 전에 watermark를 다시 잡음
+    if wrote and watermark is not None:
+        watermark = await asyncio.to_thread(timed, "probe", probe_notion_watermark, source["notion_database_id"])
+
+    data = await asyncio.to_thread(
+        timed, "window_fetch", fetch_notion_data_for_window,
+        base_date_obj, src_state, sched_pages, source["notion_database_id"],
+    )
+    # 여기까지 반영했으므로 다음 probe는 이 시점 이후의 수정만 봄
+    if watermark is not None:
+        src_state["notion_watermark"] = watermark
+    return data
+
+def publish(webhook_url, dest_state: dict, data, eff_str, tag=""):
+    """
+    디스코드 메시지 생성/수정(내용이 같으면 건너뜀)
+    """
+    with phase_timer("render"):
+        payload = create_discord_payload(data, eff_str)
+
+    saved_date = dest_state.get("date")
+    saved_message_id = dest_state.get("message_id")
+    new_hash = payload_hash(payload)
 
     if saved_date == eff_str and saved_message_id:
-        edit_message(webhook_url, saved_message_id, payload)
-        print(f"✅ Edited message: {saved_message_id}")
+        if dest_state.get("payload_hash") == new_hash:
+            count_outcomes("messages", skipped=1)
+            print(f"⏭️ {tag}Skipped edit (unchanged): {saved_message_id}")
+            return
+        with phase_timer("post"):
+            edit_message(webhook_url, saved_message_id, payload)
+        dest_state["payload_hash"] = new_hash
+        count_outcomes("messages", edited=1)
+        print(f"✅ {tag}Edited message: {saved_message_id}")
     else:
-        new_id = send_new_message(webhook_url, payload)
-        state["date"] = eff_str
-        state["message_id"] = new_id
+        with phase_timer("post"):
+            new_id = send_new_message(webhook_url, payload)
+        count_outcomes("messages", created=1)
+        dest_state["date"] = eff_str
+        dest_state["message_id"] = new_id
+        dest_state["payload_hash"] = new_hash
+        print(f"✅ {tag}Created new message: {new_id}")
+
+async def run_cycle_async(config: dict, state: dict, now=None):
+    """
+    1회 실행(asyncio)
+    - 먼저 source마다 probe(노션 1쿼리 + 캘린더 1호출): 노션 / 캘린더 / 롤오버 / states 전환 중
+      바뀐 게 없으면 여기서 끝(PROBE_MAX_SKIP_MINUTES마다 / 노션 캐시 전체 재조회 차례면 실행)
+    - 바뀐 source와 그걸 구독하는(또는 날짜가 넘어간) destination만 이어서 실행
+    - source마다 (필요하면) 캘린더 -> 노션 동기화 + window 조회를 동시에 시작
+      (source 안에서도 캘린더 조회와 노션 캐시 갱신은 겹쳐서 실행)
+    - destination은 자기가 구독하는 source가 끝나는 즉시 렌더해 디스코드로
+    - 실패한 source를 구독하는 destination은 건너뛰고, 마지막에 첫 에러를 다시 raise
+    """
+    now = now or kst_now()
+    base_date_obj = effective_date(now)
+    eff_str = base_date_obj.strftime("%Y-%m-%d")
+    flat = config.get("flat_state")
+
+    def _tag(name):
+        return "" if flat else f"[{name}] "
+
+    sources = {src["name"]: src for src in config["sources"]}
+    with phase_timer("probe"):
+        probe_results = await asyncio.gather(*(
+            probe_source(src, source_state(state, config, name), base_date_obj, now, _tag(name))
+            for name, src in sources.items()
+        ))
+    probes = dict(zip(sources, probe_results))
+
+    last_full = parse_iso_to_kst_dt(state.get("last_full_run_at"))
+    forced = not last_full or now - last_full >= timedelta(minutes=PROBE_MAX_SKIP_MINUTES)
+    changed = {name: forced or source_changed(probe) for name, probe in probes.items()}
+
+    def _needs_publish(dest):
+        dest_state = destination_state(state, config, dest["name"])
+        rolled_over = dest_state.get("date") != eff_str or not dest_state.get("message_id")
+        return rolled_over or any(changed[name] for name in dest["sources"])
+
+    destinations = [dest for dest in config["destinations"] if _needs_publish(dest)]
+    active = {name for name, c in changed.items() if c}
+    active.update(name for dest in destinations for name in dest["sources"])
+    if not active:
+        with phase_timer("state_save"):
+            save_state(state)
+        count_outcomes("runs", skipped=1)
+        print("💤 No changes since last run, skipped")
+        return
+
+    source_tasks = {}
+    for name in sources:
+        if name not in active:
+            continue
+        src_state = source_state(state, config, name)
+        source_tasks[name] = asyncio.create_task(
+            collect_source(sources[name], src_state, base_date_obj, now, probes[name], _tag(name))
+        )
+
+    async def _deliver(dest):
+        dest_state = destination_state(state, config, dest["name"])
+        try:
+            datas = await asyncio.gather(*(source_tasks[name] for name in dest["sources"]))
+        except Exception:
+            return None  # source 에러는 아래에서 한 번만 보고
+        data_by_source = dict(zip(dest["sources"], datas))
+        await asyncio.to_thread(
+            publish,
+            dest["webhook_url"],
+            dest_state,
+            {"results": route_tasks(dest, data_by_source)},
+            eff_str,
+            _tag(dest["name"]),
+        )
+
+    delivered = await asyncio.gather(
+        *(_deliver(dest) for dest in destinations), return_exceptions=True
+    )
+    source_results = await asyncio.gather(*source_tasks.values(), return_exceptions=True)
+    failed = any(isinstance(res, BaseException) for res in list(source_results) + list(delivered))
+    if not failed and len(source_tasks) == len(sources) and len(destinations) == len(config["destinations"]):
+        state["last_full_run_at"] = now.astimezone(timezone.utc).isoformat()
+    with phase_timer("state_save"):
         save_state(state)
-        print(f"✅ Created new message: {new_id}")
+
+    errors = []
+    for name, res in zip(source_tasks, source_results):
+        if isinstance(res, BaseException):
+            print(f"⚠️ {_tag(name)}Source failed: {res!r}")
+            errors.append(res)
+    for dest, res in zip(destinations, delivered):
+        if isinstance(res, BaseException):
+            print(f"⚠️ {_tag(dest['name'])}Publish failed: {res!r}")
+            errors.append(res)
+    if errors:
+        raise errors[0]
+
+def run_cycle(config: dict, state: dict, now=None):
+    """
+    1회 실행 + 끝나면(실패해도) 이번 실행의 지표 출력
+    """
+    reset_metrics()
+    t0 = time.perf_counter()
+    ok = False
+    try:
+        asyncio.run(run_cycle_async(config, state, now))
+        ok = True
+    finally:
+        export_metrics(time.perf_counter() - t0, ok)
+
+
+# ==============================
+# ✅ Daemon mode
+# ==============================
+def next_rollover_at(now: datetime) -> datetime:
+    """
+    now 이후 처음 오는 ROLLOVER_HOUR:ROLLOVER_MINUTE (KST)
+    """
+    now = now.astimezone(KST)
+    at = now.replace(hour=ROLLOVER_HOUR, minute=ROLLOVER_MINUTE, second=0, microsecond=0)
+    if at <= now:
+        at += timedelta(days=1)
+    return at
+
+def next_gcal_sync_at(state: dict, now: datetime) -> datetime:
+    last = parse_iso_to_kst_dt(state.get("last_gcal_sync_at"))
+    if not last:
+        return now
+    return last + timedelta(minutes=GCAL_SYNC_EVERY_MINUTES)
+
+def next_cycle_at(gcal_states, now: datetime) -> datetime:
+    """
+    다음 사이클 시각 = 디스코드 갱신 / 캘린더 동기화(source별) / 일정 states 전환 / 09:30 롤오버 중 가장 빠른 것
+    (동기화가 이미 밀려 있으면 = 방금 실패한 것이므로 디스코드 갱신 주기에 맞춰 재시도)
+    """
+    candidates = [now + timedelta(minutes=DISCORD_REFRESH_MINUTES), next_rollover_at(now)]
+    for src_state in gcal_states:
+        gcal_at = next_gcal_sync_at(src_state, now)
+        if gcal_at > now:
+            candidates.append(gcal_at)
+        transition_at = next_status_transition_at(src_state)
+        if transition_at and transition_at > now:
+            candidates.append(transition_at)
+    return min(candidates)
+
+def run_daemon(config: dict):
+    """
+    프로세스를 계속 띄워두고 사이클 반복
+    - HTTP 세션 / Calendar 서비스 / 노션 캐시(state)를 사이클 사이에 재사용
+    - SIGINT / SIGTERM이면 진행 중인 사이클을 마치고 종료
+    """
+    import signal
+
+    stop = threading.Event()
+
+    def _request_stop(signum, _frame):
+        print(f"🛑 Received signal {signum}, stopping after this cycle")
+        stop.set()
+
+    signal.signal(signal.SIGINT, _request_stop)
+    signal.signal(signal.SIGTERM, _request_stop)
+
+    state = load_state()
+    failures = 0
+    while not stop.is_set():
+        try:
+            run_cycle(config, state)
+            failures = 0
+        except Exception as e:
+            failures += 1
+            print(f"⚠️ Cycle failed ({failures}): {e!r}")
+
+        now = kst_now()
+        gcal_states = [
+            source_state(state, config, src["name"])
+            for src in config["sources"] if src.get("gcal_id") is not None
+        ]
+        wake_at = next_cycle_at(gcal_states, now)
+        wait = (wake_at - now).total_seconds()
+        if failures:
+            wait = min(wait, backoff_delay(failures) + 1)
+        stop.wait(max(1.0, wait))
+
+    save_state(state)
+    print("👋 Daemon stopped")
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Notion / Google Calendar -> Discord daily task bot")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="프로세스를 띄워두고 주기적으로 실행(GCAL_SYNC_EVERY_MINUTES / DISCORD_REFRESH_MINUTES / 롤오버)",
+    )
+    parser.add_argument(
+        "--config",
+        default=os.getenv("BOT_CONFIG"),
+        help="여러 source/destination 설정 JSON 경로(없으면 환경변수 1세트로 실행)",
+    )
+    args = parser.parse_args(argv)
+
+    config = load_bot_config(args.config) if args.config else env_config()
+
+    if args.daemon:
+        run_daemon(config)
+        return
+
+    run_cycle(config, load_state())
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        close_http_sessions()
+        close_state_store()
+        print(startup_report())
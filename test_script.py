@@ -0,0 +1,344 @@
+"""
+script.py 순수 로직의 무작위 비교 테스트(네트워크 없음)
+- 각 함수 결과를 단순한 전수 계산(brute force)과 비교
+    python -m pytest -q test_script.py
+"""
+import json
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import script
+
+
+SEEDS = range(20)
+
+
+# ==============================
+# ✅ TaskIntervalIndex
+# ==============================
+def make_task(i, start, end):
+    return script.TaskRecord(
+        page_id=f"p{i}", title=f"task {i}", status="시작 전", labels=(), categories=(),
+        priority=None, priority_rank=0, start_date=start, end_date=end, start_dt=script.NO_START_DT,
+    )
+
+def random_tasks(rnd, n, base):
+    tasks = []
+    for i in range(n):
+        start = base + timedelta(days=rnd.randint(-400, 400))
+        end = start + timedelta(days=rnd.choice([0, 0, 0, 1, 3, 30, 200]))
+        tasks.append(make_task(i, start, end))
+    return tasks
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_interval_index_matches_brute_force(seed):
+    rnd = random.Random(seed)
+    base = date(2026, 1, 1)
+    tasks = random_tasks(rnd, rnd.randint(0, 300), base)
+    index = script.TaskIntervalIndex(tasks)
+    assert len(index) == len(tasks)
+
+    for _ in range(50):
+        a = base + timedelta(days=rnd.randint(-450, 450))
+        b = a + timedelta(days=rnd.choice([0, 1, 2, 10, 100]))
+        expected = [t for t in tasks if t.start_date <= b and t.end_date >= a]
+        assert index.overlapping(a, b) == expected
+        assert index.active_on(a) == [t for t in tasks if t.start_date <= a <= t.end_date]
+
+
+# ==============================
+# ✅ diff_notion_props
+# ==============================
+def random_props(rnd):
+    start = datetime(2026, 10, rnd.randint(1, 28), rnd.randint(0, 23), rnd.choice([0, 30]), tzinfo=script.KST)
+    end = start + timedelta(minutes=rnd.choice([30, 60, 90]))
+    return {
+        script.TITLE_PROP: {"title": [{"text": {"content": f"meeting {rnd.randint(0, 9)}"}}]},
+        script.STATUS_PROP: {"status": {"name": rnd.choice(["시작 전", "진행 중", "완료"])}},
+        script.CATEGORY_PROP: {"multi_select": [{"name": n} for n in rnd.sample(["SCHED", "ETC", "WORK"], 2)]},
+        script.PRIORITY_PROP: {"select": {"name": rnd.choice(["-", "1", "2"])}},
+        script.DATE_PROP: {"date": {"start": start.isoformat(), "end": end.isoformat()}},
+        script.GCAL_EVENT_ID_PROP: {"rich_text": [{"text": {"content": f"ev{rnd.randint(0, 9)}"}}]},
+    }
+
+def page_from_props(rnd, props):
+    """
+    쓰기 payload -> 노션이 돌려주는 형태(plain_text, .000 밀리초, 순서가 바뀐 multi_select)
+    """
+    out = {}
+    for name, prop in props.items():
+        kind = next(iter(prop))
+        value = prop[kind]
+        if kind in ("title", "rich_text"):
+            value = [{"type": "text", "text": x["text"], "plain_text": x["text"]["content"]} for x in value]
+        elif kind == "multi_select":
+            value = rnd.sample(value, len(value))
+        elif kind == "date":
+            value = {k: v.replace(":00+09:00", ":00.000+09:00") for k, v in value.items()}
+        out[name] = {"id": name, "type": kind, kind: value}
+    return {"id": "page-1", "properties": out}
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_diff_notion_props_reports_exactly_the_changed_props(seed):
+    rnd = random.Random(seed)
+    for _ in range(100):
+        props = random_props(rnd)
+        page = page_from_props(rnd, props)
+        assert script.diff_notion_props(page, props) == {}
+
+        other = random_props(rnd)
+        changed_names = set(rnd.sample(sorted(props), rnd.randint(0, len(props))))
+        desired = {name: (other[name] if name in changed_names else props[name]) for name in props}
+        expected = {
+            name for name in props
+            if json.dumps(script._prop_value_for_compare(desired[name]))
+            != json.dumps(script._prop_value_for_compare(props[name]))
+        }
+        assert set(script.diff_notion_props(page, desired)) == expected
+
+
+# ==============================
+# ✅ SQLite state store
+# ==============================
+@pytest.fixture
+def state_store(tmp_path, monkeypatch):
+    script.close_state_store()
+    monkeypatch.setattr(script, "STATE_DB", str(tmp_path / "state.sqlite3"))
+    monkeypatch.setattr(script, "STATE_EXPORT_FILE", "")
+    monkeypatch.setattr(script, "LEGACY_STATE_FILE", str(tmp_path / "missing.json"))
+    yield
+    script.close_state_store()
+
+def reload_state():
+    script.close_state_store()
+    return script.load_state()
+
+def plain(state):
+    """
+    비교용 dict(빈 sources/destinations 그룹은 저장할 게 없으므로 뺌)
+    """
+    out = json.loads(json.dumps(state))
+    for group in script.STATE_GROUPS:
+        if not out.get(group, True):
+            out.pop(group)
+    return out
+
+def random_page(rnd, page_id):
+    return {"id": page_id, "last_edited_time": f"2026-10-{rnd.randint(1, 28):02d}T00:00:00.000Z", "properties": {}}
+
+def mutate_state(rnd, state):
+    for _ in range(rnd.randint(1, 8)):
+        roll = rnd.random()
+        if roll < 0.25:
+            state[rnd.choice(["date", "message_id", "gcal_sync_token"])] = rnd.choice([None, "x", rnd.randint(0, 9)])
+        elif roll < 0.35 and state:
+            state.pop(rnd.choice(sorted(state)))
+        elif roll < 0.55:
+            group = rnd.choice(script.STATE_GROUPS)
+            name = rnd.choice(["a", "b"])
+            state.setdefault(group, {}).setdefault(name, {})["date"] = rnd.randint(0, 9)
+        elif roll < 0.6 and state.get("sources"):
+            state["sources"].pop(rnd.choice(sorted(state["sources"])))
+        elif roll < 0.75:
+            cache = state.setdefault("notion_cache", {"pages": {}})
+            cache["high_water"] = f"2026-10-18T0{rnd.randint(0, 9)}:00:00+00:00"
+            page_id = f"page-{rnd.randint(0, 20)}"
+            cache["pages"][page_id] = random_page(rnd, page_id)
+        elif roll < 0.85 and (state.get("notion_cache") or {}).get("pages"):
+            state["notion_cache"]["pages"].pop(rnd.choice(sorted(state["notion_cache"]["pages"])))
+        else:
+            # full 갱신처럼 캐시 통째로 교체
+            state["notion_cache"] = {
+                "full_at": "2026-10-18T00:00:00+00:00",
+                "pages": {f"page-{i}": random_page(rnd, f"page-{i}") for i in rnd.sample(range(20), 5)},
+            }
+
+@pytest.mark.parametrize("seed", range(5))
+def test_state_round_trip(state_store, seed):
+    rnd = random.Random(seed)
+    state = script.load_state()
+    assert state == {}
+    for _ in range(15):
+        mutate_state(rnd, state)
+        expected = plain(state)
+        script.save_state(state)
+        state = reload_state()
+        assert plain(state) == expected
+
+
+# ==============================
+# ✅ Notion write queue (outbox)
+# ==============================
+def random_write(rnd, first):
+    props = {rnd.choice("abcd"): {"select": {"name": str(rnd.randint(0, 3))}} for _ in range(rnd.randint(0, 2))}
+    if first and rnd.random() < 0.5:
+        return script.notion_write("create", None, "ev1", props)
+    if rnd.random() < 0.2:
+        return script.notion_write("archive", "page-1", "ev1")
+    return script.notion_write("update", "page-1", "ev1", props)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_coalesce_matches_sequential_apply(seed):
+    rnd = random.Random(seed)
+    for _ in range(200):
+        writes = [random_write(rnd, i == 0) for i in range(rnd.randint(1, 6))]
+
+        # 순서대로 하나씩 보낸 것과 같은 결과여야 함
+        archived, props = False, {}
+        for write in writes:
+            if write["op"] == "archive":
+                archived = True
+            elif not archived:
+                props.update(write["props"])
+
+        merged = None
+        for write in writes:
+            merged = script.coalesce_notion_write(merged, write)
+
+        if archived:
+            assert merged["op"] == "archive"
+        else:
+            assert merged["op"] == writes[0]["op"]
+            assert merged["props"] == props
+
+def test_outbox_coalesces_in_the_db(state_store):
+    script.load_state()
+    script.enqueue_notion_writes("db", [
+        script.notion_write("update", "page-1", "ev1", {"a": {"select": {"name": "1"}}}),
+        script.notion_write("update", "page-1", "ev1", {"b": {"select": {"name": "2"}}}),
+    ])
+    reload_state()
+    [write] = script.pending_notion_writes("db")
+    assert (write["op"], sorted(write["props"])) == ("update", ["a", "b"])
+
+    script.enqueue_notion_writes("db", [script.notion_write("archive", "page-1", "ev1")])
+    script.enqueue_notion_writes("db", [script.notion_write("update", "page-1", "ev1", {"c": {}})])
+    [write] = script.pending_notion_writes("db")
+    assert (write["op"], write["props"]) == ("archive", {})
+
+class FakeNotion:
+    """
+    apply_gcal_changes가 부르는 노션 함수 대역(보낸 쓰기를 기록, fail_creates면 500)
+    """
+    def __init__(self, monkeypatch):
+        self.sent = []
+        self.fail_creates = False
+        monkeypatch.setattr(script, "create_notion_page", self.create)
+        monkeypatch.setattr(script, "update_notion_page", self.update)
+        monkeypatch.setattr(script, "archive_notion_page", self.archive)
+        monkeypatch.setattr(script, "find_pages_by_gcal_event_ids", lambda eids, database_id=None: {})
+
+    def create(self, props, database_id=None):
+        self.sent.append(("create", props))
+        if self.fail_creates:
+            resp = type("Resp", (), {"status_code": 500})()
+            raise script.requests.HTTPError("500", response=resp)
+        return {"id": "new-page", "properties": {}}
+
+    def update(self, page_id, props):
+        self.sent.append(("update", page_id, props))
+        return {"id": page_id, "properties": {}}
+
+    def archive(self, page_id):
+        self.sent.append(("archive", page_id))
+        return {"id": page_id}
+
+def calendar_event(base_date, eid, summary, status="confirmed"):
+    start = datetime(base_date.year, base_date.month, base_date.day, 23, 0, tzinfo=script.KST)
+    return {
+        "id": eid, "status": status, "summary": summary,
+        "start": {"dateTime": start.isoformat()}, "end": {"dateTime": (start + timedelta(hours=1)).isoformat()},
+    }
+
+def sync_state(base_date):
+    window_start, _end, _plus1 = script.sync_window(base_date)
+    return {"gcal_sync_window": window_start.strftime("%Y-%m-%d"), "notion_cache": {"pages": {}}}
+
+def test_queued_create_for_cancelled_event_is_not_replayed(state_store, monkeypatch):
+    notion = FakeNotion(monkeypatch)
+    base_date = script.effective_date()
+    prop_types = {script.STATUS_PROP: "status"}
+    state = sync_state(base_date)
+
+    notion.fail_creates = True
+    summary = script.apply_gcal_changes(
+        base_date, state, ([calendar_event(base_date, "E", "meeting")], "tok1", True), [], prop_types, "db"
+    )
+    assert summary["errors"] and [w["op"] for w in script.pending_notion_writes("db")] == ["create"]
+
+    # 다음 실행: 증분 결과에서 E가 취소됨 -> 남은 create를 보내면 안 됨
+    notion.fail_creates = False
+    notion.sent.clear()
+    summary = script.apply_gcal_changes(
+        base_date, state, ([calendar_event(base_date, "E", "meeting", "cancelled")], "tok2", True), [], prop_types, "db"
+    )
+    assert notion.sent == []
+    assert script.pending_notion_writes("db") == []
+    assert summary["errors"] == [] and state["gcal_sync_token"] == "tok2"
+
+def test_queued_update_is_dropped_when_event_reverts(state_store, monkeypatch):
+    notion = FakeNotion(monkeypatch)
+    base_date = script.effective_date()
+    prop_types = {script.STATUS_PROP: "status"}
+    ev = calendar_event(base_date, "E", "meeting")
+    page = {
+        "id": "page-E", "created_time": "2026-01-01T00:00:00.000Z",
+        "properties": page_from_props(random.Random(0), script.notion_props_for_gcal_event(ev, prop_types))["properties"],
+    }
+    state = sync_state(base_date)
+
+    # 이전 실행에서 제목 변경 update가 실패해 남아 있음
+    renamed = script.notion_props_for_gcal_event(calendar_event(base_date, "E", "renamed"), prop_types)
+    script.enqueue_notion_writes("db", [
+        script.notion_write("update", "page-E", "E", {script.TITLE_PROP: renamed[script.TITLE_PROP]})
+    ])
+
+    # 일정 제목이 원래대로 돌아옴 -> 새 diff는 비었고, 옛 제목을 다시 쓰면 안 됨
+    summary = script.apply_gcal_changes(base_date, state, ([ev], "tok2", True), [page], prop_types, "db")
+    assert notion.sent == []
+    assert script.pending_notion_writes("db") == []
+    assert summary["errors"] == []
+
+
+# ==============================
+# ✅ pop_due_transitions
+# ==============================
+@pytest.mark.parametrize("seed", SEEDS)
+def test_pop_due_transitions_matches_brute_force(seed):
+    rnd = random.Random(seed)
+    t0 = datetime(2026, 10, 18, 9, 0, tzinfo=script.KST)
+
+    def random_bounds():
+        start = t0 + timedelta(minutes=10 * rnd.randint(-6, 60))
+        end = start + timedelta(minutes=10 * rnd.randint(1, 12))
+        return [start.isoformat(), end.isoformat()]
+
+    known = {f"ev{i}": random_bounds() for i in range(rnd.randint(0, 30))}
+    heap = []
+    for eid, (s, e) in known.items():
+        script.schedule_status_transition(heap, eid, datetime.fromisoformat(s), datetime.fromisoformat(e), t0)
+
+    prev = t0
+    while prev < t0 + timedelta(hours=12):
+        now = prev + timedelta(minutes=10 * rnd.randint(1, 6))
+        # 동기화처럼: 일부 일정은 시간이 바뀌거나 사라지고, 바뀐 일정은 지금 기준으로 다시 예약
+        touched = set()
+        for eid in rnd.sample(sorted(known), min(len(known), rnd.randint(0, 2))):
+            touched.add(eid)
+            if rnd.random() < 0.3:
+                known.pop(eid)
+                continue
+            known[eid] = random_bounds()
+            s, e = known[eid]
+            script.schedule_status_transition(heap, eid, datetime.fromisoformat(s), datetime.fromisoformat(e), now)
+
+        expected = {
+            eid for eid, bounds in known.items()
+            if eid not in touched and any(prev < datetime.fromisoformat(x) <= now for x in bounds)
+        }
+        due = script.pop_due_transitions(heap, known, now) - touched
+        assert due == expected
+        assert all(heap[(i - 1) // 2] <= heap[i] for i in range(1, len(heap)))
+        prev = now